@@ -1,62 +1,24 @@
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-import time, random
+from tkinter import ttk, messagebox, simpledialog, filedialog
+import time, random, threading
+from math import isqrt
+
+from .corpus import Corpus, is_corpus
+from .csp import (SearchAborted, SearchBudget, SearchStats, count_solutions, format_tokens,
+                  from_grid, geometry, parse_puzzle, parse_tokens)
+from .generator import generate
+from .puzzles import PUZZLES
 
 SIZE = 9
 CELL = 52
 PAD = 12
-
-PUZZLES = ['530070000600195000098000060800060003400803001700020006060000280000419005000080079',
-           '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
-           '200080300060070084030500209000105408000000000402706000301007040720040060004010003',
-           '000000907000420180000705026100904000050000040000507009920108000034059000507000000',
-           '030050040008010500460000012070502080000603000040109030250000098001020600080060020',
-'020810740700003100090002805009040087400208003160030200302700060005600008076051090',
-'100920000524010000000000070050008102000000000402700090060000000000030945000071006',
-'043080250600000000000001094900004070000608000010200003820500000000000005034090710',
-'480006902002008001900370060840010200003704100001060049020085007700900600609200018',
-'000900002050123400030000160908000000070000090000000205091000050007439020400007000',
-'001900003900700160030005007050000009004302600200000070600100030042007006500006800',
-'000125400008400000420800000030000095060902010510000060000003049000007200001298000',
-'062340750100005600570000040000094800400000006005830000030000091006400007059083260',
-'300000000005009000200504000020000700160000058704310600000890100000067080000005437',
-'630000000000500008005674000000020000003401020000000345000007004080300902947100080',
-'000020040008035000000070602031046970200000000000501203049000730000000010800004000',
-'361025900080960010400000057008000471000603000259000800740000005020018060005470329',
-'050807020600010090702540006070020301504000908103080070900076205060090003080103040',
-'080005000000003457000070809060400903007010500408007020901020000842300000000100080',
-'003502900000040000106000305900251008070408030800763001308000104000020000005104800',
-'000000000009805100051907420290401065000000000140508093026709580005103600000000000',
-'020030090000907000900208005004806500607000208003102900800605007000309000030020050',
-'005000006070009020000500107804150000000803000000092805907006000030400010200000600',
-'040000050001943600009000300600050002103000506800020007005000200002436700030000040',
-'004000000000030002390700080400009001209801307600200008010008053900040000000000800',
-'360020089000361000000000000803000602400603007607000108000000000000418000970030014',
-'500400060009000800640020000000001008208000501700500000000090084003000600060003002',
-'007256400400000005010030060000508000008060200000107000030070090200000004006312700',
-'000000000079050180800000007007306800450708096003502700700000005016030420000000000',
-'030000080009000500007509200700105008020090030900402001004207100002000800070000090',
-'200170603050000100000006079000040700000801000009050000310400000005000060906037002',
-'000000080800701040040020030374000900000030000005000321010060050050802006080000000',
-'000000085000210009960080100500800016000000000890006007009070052300054000480000000',
-'608070502050608070002000300500090006040302050800050003005000200010704090409060701',
-'050010040107000602000905000208030501040070020901080406000401000304000709020060010',
-'053000790009753400100000002090080010000907000080030070500000003007641200061000940',
-'006080300049070250000405000600317004007000800100826009000702000075040190003090600',
-'005080700700204005320000084060105040008000500070803010450000091600508007003010600',
-'000900800128006400070800060800430007500000009600079008090004010003600284001007000',
-'000080000270000054095000810009806400020403060006905100017000620460000038000090000',
-'000602000400050001085010620038206710000000000019407350026040530900020007000809000',
-'000900002050123400030000160908000000070000090000000205091000050007439020400007000',
-'380000000000400785009020300060090000800302009000040070001070500495006000000000092',
-'000158000002060800030000040027030510000000000046080790050000080004070100000325000',
-'010500200900001000002008030500030007008000500600080004040100700000700006003004050',
-'080000040000469000400000007005904600070608030008502100900000005000781000060000010',
-'904200007010000000000706500000800090020904060040002000001607000000000030300005702',
-'000700800006000031040002000024070000010030080000060290000800070860000500002006000',
-'001007090590080001030000080000005800050060020004100000080000030100020079020700400',
-'000003017015009008060000000100007000009000200000500004000000020500600340340200000']
+BOARD = SIZE * CELL  # board width in pixels; cells shrink on larger boards
+# Two digits typed into the same cell within this many seconds form one
+# value on boards larger than 9x9
+DIGIT_CHORD = 1.0
+# Milliseconds between progress updates while the solver runs
+POLL_MS = 100
 
 DEFAULT_PUZZLE = random.choice(PUZZLES)
 
@@ -65,11 +27,13 @@ class SudokuUI:
         self.root = root
         self.root.title("HW2 Sudoku — CSP (Friendlier UI)")
 
-        self.values = [[0]*SIZE for _ in range(SIZE)]
-        self.given  = [[False]*SIZE for _ in range(SIZE)]
-        self.notes  = [[set() for _ in range(SIZE)] for __ in range(SIZE)]
+        self.size, self.box, self.cell = SIZE, 3, CELL
+        self.last_digit = (None, 0, 0.0)  # (cell, digit, time) of the last digit key
+        self.values = [[0]*self.size for _ in range(self.size)]
+        self.given  = [[False]*self.size for _ in range(self.size)]
+        self.notes  = [[set() for _ in range(self.size)] for __ in range(self.size)]
         self.sel = (0, 0)
-        self.original = [[0]*SIZE for _ in range(SIZE)]
+        self.original = [[0]*self.size for _ in range(self.size)]
         self.status = tk.StringVar(value="Click a cell and type 1–9. Arrow keys move. Shift+digit adds a note. N toggles Note Mode.")
         self.note_mode = tk.BooleanVar(value=False)
 
@@ -78,20 +42,31 @@ class SudokuUI:
         self.use_lcv = tk.BooleanVar(value=True)
         self.use_fc  = tk.BooleanVar(value=True)
         self.use_ac3 = tk.BooleanVar(value=False)
+        self.use_mac = tk.BooleanVar(value=False)
+        self.use_cbj = tk.BooleanVar(value=False)
+        self.use_portfolio = tk.BooleanVar(value=False)
+        # Search budget; blank means no limit
+        self.time_limit = tk.StringVar(value="30")
+        self.node_limit = tk.StringVar(value="")
+        self.job = None  # running solve: dict(thread, budget, stats, ...)
 
         self.timer_var = tk.StringVar(value="")
         self.err_cells = set()  # set[(r,c)] with conflicts
+        self.unit_counts = []   # unit_counts[u][d]: cells of unit u holding d
 
         # Top toolbar
         top = ttk.Frame(root, padding=(8,6,8,4)); top.pack(fill="x")
         ttk.Button(top, text="New", command=self.new_game).pack(side='left', padx=2)
         ttk.Button(top, text="Import", command=self.import_dialog).pack(side="left", padx=2)
+        ttk.Button(top, text="Open", command=self.open_dialog).pack(side="left", padx=2)
         ttk.Button(top, text="Export", command=self.export_dialog).pack(side="left", padx=2)
         ttk.Button(top, text="Reset", command=self.reset).pack(side="left", padx=2)
         ttk.Button(top, text="Auto Notes", command=self.auto_notes).pack(side="left", padx=8)
         ttk.Separator(top, orient="vertical").pack(side="left", fill="y", padx=8)
         ttk.Button(top, text="Validate", command=self.validate).pack(side="left", padx=2)
         ttk.Button(top, text="Solve (AI)", command=self.solve).pack(side="left", padx=2)
+        self.cancel_btn = ttk.Button(top, text="Cancel", command=self.cancel_solve, state="disabled")
+        self.cancel_btn.pack(side="left", padx=2)
         ttk.Label(top, textvariable=self.timer_var).pack(side="right")
 
         # Options
@@ -102,12 +77,20 @@ class SudokuUI:
         ttk.Checkbutton(opts, text="LCV", variable=self.use_lcv).pack(side="left")
         ttk.Checkbutton(opts, text="Forward Checking", variable=self.use_fc).pack(side="left")
         ttk.Checkbutton(opts, text="AC-3", variable=self.use_ac3).pack(side="left")
+        ttk.Checkbutton(opts, text="MAC", variable=self.use_mac).pack(side="left")
+        ttk.Checkbutton(opts, text="Backjump", variable=self.use_cbj).pack(side="left")
+        ttk.Checkbutton(opts, text="Portfolio", variable=self.use_portfolio).pack(side="left")
+        ttk.Label(opts, text=" | Limit s:").pack(side="left")
+        ttk.Entry(opts, textvariable=self.time_limit, width=5).pack(side="left")
+        ttk.Label(opts, text=" nodes:").pack(side="left")
+        ttk.Entry(opts, textvariable=self.node_limit, width=8).pack(side="left")
 
         # Canvas grid
-        w = h = SIZE*CELL + 1
+        w = h = self.size*self.cell + 1
         self.canvas = tk.Canvas(root, width=w+2*PAD, height=h+2*PAD, bg="white", highlightthickness=0)
         self.canvas.pack(padx=8, pady=6)
         self.canvas.bind("<Button-1>", self.on_click)
+        self.build_canvas()
         self.root.bind("<Key>", self.on_key)
 
         # Status bar
@@ -119,17 +102,18 @@ class SudokuUI:
 
     # ---------- Model helpers ----------
     def load_puzzle(self, s: str):
-        s = "".join(ch for ch in s if ch.isdigit())
-        if len(s) != 81:
-            messagebox.showerror("Import", "Puzzle must be exactly 81 digits (0 for blank).")
+        grid = parse_tokens(s)
+        if grid is None:
+            messagebox.showerror("Import", "Puzzle must be 81 digits (0 for blank), or n*n "
+                                           "space-separated values for a 4x4 to 25x25 board.")
             return
-        self.values = [[0]*SIZE for _ in range(SIZE)]
-        self.given  = [[False]*SIZE for _ in range(SIZE)]
-        self.notes  = [[set() for _ in range(SIZE)] for __ in range(SIZE)]
-        k = 0
-        for r in range(SIZE):
-            for c in range(SIZE):
-                v = int(s[k]); k += 1
+        self.resize(len(grid))
+        self.values = [[0]*self.size for _ in range(self.size)]
+        self.given  = [[False]*self.size for _ in range(self.size)]
+        self.notes  = [[set() for _ in range(self.size)] for __ in range(self.size)]
+        for r in range(self.size):
+            for c in range(self.size):
+                v = int(grid[r][c])
                 self.values[r][c] = v
                 if v != 0:
                     self.given[r][c] = True
@@ -138,12 +122,22 @@ class SudokuUI:
         self.compute_conflicts()
         self.status.set("Loaded puzzle. Tip: Shift+digit adds a pencil mark; V validates; S solves.")
 
+    def resize(self, size: int):
+        """Switch to a size x size board, resizing the canvas."""
+        if size == self.size:
+            return
+        self.size, self.box = size, isqrt(size)
+        self.cell = BOARD // size
+        self.sel = (0, 0)
+        w = h = size*self.cell + 1
+        self.canvas.config(width=w+2*PAD, height=h+2*PAD)
+        self.build_canvas()
+
     def export_puzzle(self) -> str:
-        out = []
-        for r in range(SIZE):
-            for c in range(SIZE):
-                out.append(str(self.values[r][c] or 0))
-        return "".join(out)
+        grid = [[str(self.values[r][c] or 0) for c in range(self.size)] for r in range(self.size)]
+        if self.size == SIZE:
+            return from_grid(grid)
+        return format_tokens(grid)
 
     def set_cell(self, r, c, v, is_note=False):
         if self.given[r][c] and not is_note:
@@ -157,79 +151,79 @@ class SudokuUI:
                 else:
                     self.notes[r][c].add(v)
         else:
+            old = self.values[r][c]
             self.values[r][c] = v
             self.notes[r][c].clear()
-        self.compute_conflicts()
+            if old != v:
+                self.move_digit(r, c, old, v)
 
     def reset(self):
         self.values = [row[:] for row in self.original]
-        self.notes = [[set() for _ in range(SIZE)] for __ in range(SIZE)]
+        self.notes = [[set() for _ in range(self.size)] for __ in range(self.size)]
         self.compute_conflicts()
         self.draw()
 
     def neighbors(self, r, c):
-        for cc in range(SIZE):
-            yield (r, cc)
-        for rr in range(SIZE):
-            yield (rr, c)
-        br, bc = (r//3)*3, (c//3)*3
-        for rr in range(br, br+3):
-            for cc in range(bc, bc+3):
-                yield (rr, cc)
+        return [divmod(p, self.size) for p in geometry(self.box).peers[r*self.size + c]]
 
     def compute_conflicts(self):
+        """Rebuild the per-unit digit counts and err_cells from scratch."""
+        g = geometry(self.box)
+        n = self.size
+        # unit_counts[u][d] -> how many cells of unit u hold digit d
+        self.unit_counts = [[0]*(n+1) for _ in g.units]
+        for cell in range(g.cells):
+            v = self.values[cell // n][cell % n]
+            if v:
+                for u in g.cell_units[cell]:
+                    self.unit_counts[u][v] += 1
         self.err_cells = set()
-        # Rows
-        for r in range(SIZE):
-            seen = {}
-            for c in range(SIZE):
-                v = self.values[r][c]
-                if v:
-                    if v in seen:
-                        self.err_cells.add((r, c))
-                        self.err_cells.add((r, seen[v]))
-                    else:
-                        seen[v] = c
-        # Cols
-        for c in range(SIZE):
-            seen = {}
-            for r in range(SIZE):
-                v = self.values[r][c]
-                if v:
-                    if v in seen:
-                        self.err_cells.add((r, c))
-                        self.err_cells.add((seen[v], c))
-                    else:
-                        seen[v] = r
-        # Boxes
-        for br in range(0, SIZE, 3):
-            for bc in range(0, SIZE, 3):
-                seen = {}
-                for r in range(br, br+3):
-                    for c in range(bc, bc+3):
-                        v = self.values[r][c]
-                        if v:
-                            if v in seen:
-                                self.err_cells.add((r, c))
-                                self.err_cells.add(seen[v])
-                            else:
-                                seen[v] = (r, c)
+        for cell in range(g.cells):
+            self.check_conflict(cell)
+
+    def check_conflict(self, cell):
+        """Put cell in err_cells iff its digit repeats in one of its units."""
+        n = self.size
+        v = self.values[cell // n][cell % n]
+        counts = self.unit_counts
+        if v and any(counts[u][v] > 1 for u in geometry(self.box).cell_units[cell]):
+            self.err_cells.add(divmod(cell, n))
+        else:
+            self.err_cells.discard(divmod(cell, n))
+
+    def move_digit(self, r, c, old, new):
+        """Update the unit counts for (r, c) changing from old to new (0 = blank)."""
+        g = geometry(self.box)
+        n = self.size
+        cell = r*n + c
+        counts = self.unit_counts
+        for u in g.cell_units[cell]:
+            if old:
+                counts[u][old] -= 1
+            if new:
+                counts[u][new] += 1
+        # Only cells holding old or new in the same units can change state
+        for u in g.cell_units[cell]:
+            for p in g.units[u]:
+                if self.values[p // n][p % n] in (old, new):
+                    self.check_conflict(p)
+        self.check_conflict(cell)
 
     def auto_notes(self):
         # Fill notes with currently legal candidates for blank cells
-        for r in range(SIZE):
-            for c in range(SIZE):
+        for r in range(self.size):
+            for c in range(self.size):
                 if self.values[r][c] == 0:
-                    illegal = { self.values[rr][cc] for (rr,cc) in self.neighbors(r,c) if self.values[rr][cc] != 0 }
-                    self.notes[r][c] = {d for d in range(1,10) if d not in illegal}
+                    illegal = { self.values[p // self.size][p % self.size] for p in geometry(self.box).peers[r*self.size + c] }
+                    self.notes[r][c] = {d for d in range(1,self.size+1) if d not in illegal}
         self.draw()
 
     # ---------- UI events ----------
     def on_click(self, ev):
         x = ev.x - PAD; y = ev.y - PAD
         if x < 0 or y < 0: return
-        c = int(x // CELL); r = int(y // CELL)
-        if 0 <= r < SIZE and 0 <= c < SIZE:
+        c = int(x // self.cell); r = int(y // self.cell)
+        if 0 <= r < self.size and 0 <= c < self.size:
             self.sel = (r, c); self.draw()
 
     def on_key(self, ev):
@@ -237,9 +231,9 @@ class SudokuUI:
         ch = ev.keysym
         # Movement
         if ch in ("Left","h","a"): c = max(0, c-1)
-        elif ch in ("Right","l","d"): c = min(SIZE-1, c+1)
+        elif ch in ("Right","l","d"): c = min(self.size-1, c+1)
         elif ch in ("Up","k","w"): r = max(0, r-1)
-        elif ch in ("Down","j","s"): r = min(SIZE-1, r+1)
+        elif ch in ("Down","j","s"): r = min(self.size-1, r+1)
         elif ch in ("Return", "KP_Enter"):
             pass
         elif ch in ("BackSpace","Delete"):
@@ -251,7 +245,13 @@ class SudokuUI:
                 digit = int(ch[3:])
             else:
                 digit = int(ch)
-            if 0 <= digit <= 9:
+            # On large boards a second digit right after the first extends it
+            cell, prev, when = self.last_digit
+            now = time.monotonic()
+            if self.size > 9 and cell == (r, c) and now - when < DIGIT_CHORD and 0 < prev*10 + digit <= self.size:
+                digit = prev*10 + digit
+            self.last_digit = ((r, c), digit, now)
+            if 0 <= digit <= self.size:
                 is_note = self.note_mode.get() or (ev.state & 0x0001)  # Shift
                 if digit == 0:
                     if is_note:
@@ -278,56 +278,204 @@ class SudokuUI:
             self.status.set(f"Conflicts found in {len(self.err_cells)} cell(s).")
         else:
             # Check completeness
-            complete = all(self.values[r][c] != 0 for r in range(SIZE) for c in range(SIZE))
-            self.status.set("Looks good!" + (" (Complete ✅)" if complete else " (Incomplete)"))
+            complete = all(self.values[r][c] != 0 for r in range(self.size) for c in range(self.size))
+            if complete:
+                self.status.set("Looks good! (Complete ✅)")
+            elif self.job is not None:
+                self.status.set("Busy. Cancel first to validate.")
+            else:
+                # Is the current grid still a well-formed puzzle? Counting can
+                # take long on big boards, so it runs like solve()
+                budget = self.read_budget()
+                if budget is None:
+                    return
+                grid = [[str(self.values[r][c]) for c in range(self.size)] for r in range(self.size)]
+                job = dict(kind="validate", stats=SearchStats(), budget=budget, grid=grid,
+                           portfolio=False)
+
+                def run():
+                    job["count"] = count_solutions(grid, limit=2, stats=job["stats"], budget=budget)
+
+                self.start_job(job, run)
         self.draw()
 
+    def read_budget(self):
+        """SearchBudget from the limit boxes, or None after reporting bad input."""
+        try:
+            max_seconds = float(self.time_limit.get()) if self.time_limit.get().strip() else None
+            max_nodes = int(self.node_limit.get()) if self.node_limit.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Limits", "Limits must be numbers (blank for no limit).")
+            return None
+        return SearchBudget(max_seconds, max_nodes)
+
+    def start_job(self, job, run):
+        """Run run() on a worker thread for job; poll_solve() reports on it."""
+        job["t0"] = time.perf_counter()
+
+        def work():
+            # Runs on the worker thread; the UI only reads job after it ends
+            try:
+                run()
+            except SearchAborted as e:
+                job["aborted"] = e.reason
+            except NotImplementedError:
+                job["error"] = "Implement solve() in sudoku/csp.py"
+            except Exception as e:
+                job["error"] = str(e)
+            job["dt"] = time.perf_counter() - job["t0"]
+
+        job["thread"] = threading.Thread(target=work, daemon=True)
+        self.job = job
+        self.cancel_btn.config(state="normal")
+        job["thread"].start()
+        self.root.after(POLL_MS, self.poll_solve)
+
     def solve(self):
+        if self.job is not None:
+            self.status.set("Already solving. Cancel first to start over.")
+            return
         try:
             from . import csp as csp
         except Exception as e:
             messagebox.showerror("Import error", f"Could not import solver: {e}")
             return
-        # Build grid of '0'/'1'..'9' strings
-        grid = [[str(self.values[r][c] or 0) for c in range(SIZE)] for r in range(SIZE)]
+        budget = self.read_budget()
+        if budget is None:
+            return
+        # Build grid of '0'/'1'..'n' strings
+        grid = [[str(self.values[r][c] or 0) for c in range(self.size)] for r in range(self.size)]
         opts = dict(
             use_mrv=self.use_mrv.get(),
             use_lcv=self.use_lcv.get(),
             use_fc=self.use_fc.get(),
             use_ac3=self.use_ac3.get(),
+            use_mac=self.use_mac.get(),
+            use_cbj=self.use_cbj.get(),
         )
-        t0 = time.perf_counter()
-        try:
-            sol = csp.solve(grid, **opts)
-        except NotImplementedError:
-            messagebox.showinfo("AI not implemented", "Implement solve() in sudoku/csp.py")
+        job = dict(kind="solve", stats=csp.SearchStats(), budget=budget, grid=grid,
+                   portfolio=self.use_portfolio.get())
+
+        def run():
+            if job["portfolio"]:
+                # Race the configurations of portfolio.PORTFOLIO instead of the flags.
+                # This runs on a worker thread next to Tk, so don't fork.
+                from .portfolio import PortfolioSolver
+                with PortfolioSolver(start_method="spawn") as racer:
+                    job["solution"], job["winner"] = racer.solve(grid, budget=budget)
+            else:
+                job["solution"] = csp.solve(grid, stats=job["stats"], budget=budget, **opts)
+
+        self.start_job(job, run)
+
+    def cancel_solve(self):
+        if self.job is not None:
+            self.job["budget"].cancel()
+            self.status.set("Cancelling…")
+
+    def poll_solve(self):
+        job = self.job
+        if job is None:
             return
-        dt = time.perf_counter() - t0
+        stats = job["stats"]
+        if job["thread"].is_alive():
+            # Progress: read the live counters the search updates
+            dt = time.perf_counter() - job["t0"]
+            rate = stats.nodes / dt if dt > 0 else 0.0
+            verb = "Validating" if job["kind"] == "validate" else "Solving"
+            self.timer_var.set(f"{verb}… {dt:.1f} s")
+            if job["portfolio"]:
+                self.status.set("Racing the portfolio configurations…")
+            else:
+                self.status.set(f"{verb}: {stats.nodes} nodes ({rate:,.0f}/s), depth {stats.depth} "
+                                f"(max {stats.max_depth}), {stats.backtracks} backtracks")
+            self.root.after(POLL_MS, self.poll_solve)
+            return
+
+        self.job = None
+        self.cancel_btn.config(state="disabled")
+        dt = job["dt"]
+        if "error" in job:
+            messagebox.showinfo("Solver error", job["error"])
+            return
+        if "aborted" in job:
+            self.timer_var.set(f"Stopped after {dt:.1f} s")
+            self.status.set(f"Stopped: {job['aborted']}. {stats.summary()}")
+            return
+        if job["kind"] == "validate":
+            current = [[str(self.values[r][c]) for c in range(self.size)] for r in range(self.size)]
+            if current != job["grid"]:
+                self.status.set("The board changed while validating; result discarded.")
+                return
+            n = job["count"]
+            self.timer_var.set(f"Validated in {dt*1000:.1f} ms")
+            self.status.set("Looks good! (Incomplete) " +
+                            ("No solution from here." if n == 0 else
+                             "Exactly one solution." if n == 1 else
+                             "More than one solution."))
+            return
+        sol = job["solution"]
         if not sol:
-            self.status.set("No solution found.")
+            self.timer_var.set(f"Failed in {dt*1000:.1f} ms")
+            self.status.set(f"No solution found. {stats.summary()}")
+            return
+        current = [[str(self.values[r][c] or 0) for c in range(self.size)] for r in range(self.size)]
+        if current != job["grid"]:
+            self.status.set("The board changed while solving; solution discarded.")
             return
         # Apply solution (keep original givens marked)
-        for r in range(SIZE):
-            for c in range(SIZE):
+        for r in range(self.size):
+            for c in range(self.size):
                 self.values[r][c] = int(sol[r][c])
         self.compute_conflicts()
         self.draw()
         self.timer_var.set(f"Solved in {dt*1000:.1f} ms")
-        self.status.set("Solved. (You can Reset to go back to the original puzzle.)")
+        detail = f"won by {job['winner']}" if "winner" in job else stats.summary()
+        self.status.set(f"Solved in {dt*1000:.1f} ms: {detail}. (Reset goes back to the original puzzle.)")
 
     # ---------- Game Generator ---------
     def new_game(self):
-        s = random.choice(PUZZLES)
-        self.load_puzzle(s)
+        rec = generate()
+        self.load_puzzle(rec['puzzle'])
+        self.status.set(f"New {rec['grade']} puzzle with {rec['givens']} givens (seed {rec['seed']}).")
         self.draw()
 
     # ---------- Import/Export ----------
     def import_dialog(self):
-        s = simpledialog.askstring("Import Puzzle", "Paste 81 digits (0 for blank):", initialvalue=DEFAULT_PUZZLE, parent=self.root)
+        s = simpledialog.askstring("Import Puzzle", "Paste 81 digits (0 for blank), or space-separated values for 4x4 to 25x25:", initialvalue=DEFAULT_PUZZLE, parent=self.root)
         if s:
             self.load_puzzle(s)
             self.draw()
 
+    def open_dialog(self):
+        """Load a random puzzle from a packed corpus or a puzzle-per-line file."""
+        path = filedialog.askopenfilename(title="Open Puzzle File", parent=self.root)
+        if not path:
+            return
+        try:
+            if is_corpus(path):
+                # Indexed straight from the mapping; the file is never read whole
+                with Corpus(path) as corpus:
+                    if not len(corpus):
+                        raise ValueError("the corpus is empty")
+                    i = random.randrange(len(corpus))
+                    puzzle = corpus[i]
+                where = f"#{i+1} of {len(corpus)}"
+            else:
+                with open(path) as f:
+                    puzzles = [p for p in map(parse_puzzle, f) if p]
+                if not puzzles:
+                    raise ValueError("no 81-digit puzzle lines found")
+                i = random.randrange(len(puzzles))
+                puzzle = puzzles[i]
+                where = f"#{i+1} of {len(puzzles)}"
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Open failed", str(e))
+            return
+        self.load_puzzle(puzzle)
+        self.status.set(f"Loaded puzzle {where} from {path}.")
+        self.draw()
+
     def export_dialog(self):
         s = self.export_puzzle()
         self.root.clipboard_clear()
@@ -335,53 +483,86 @@ class SudokuUI:
         self.status.set("Copied current puzzle to clipboard.")
 
     # ---------- Drawing ----------
-    def draw(self):
+    def build_canvas(self):
+        """Create the persistent canvas items for the current board size."""
         cv = self.canvas
         cv.delete("all")
-        # Highlights for row/col/box
-        rsel, csel = self.sel
-        # Highlight row/col
-        x0 = PAD; y0 = PAD
-        for r in range(SIZE):
-            for c in range(SIZE):
-                x = x0 + c*CELL; y = y0 + r*CELL
-                fill = "white"
-                if r == rsel or c == csel:
-                    fill = "#f9f6d2"
-                br, bc = (r//3), (c//3)
-                if (rsel//3)==br and (csel//3)==bc:
-                    fill = "#f6f0c0"
-                if (r, c) == self.sel:
-                    fill = "#e6f2ff"
-                cv.create_rectangle(x, y, x+CELL, y+CELL, fill=fill, outline="#cccccc")
-
+        n, cell = self.size, self.cell
+        self.rect_ids, self.text_ids = [], []
+        self.note_ids = [None] * (n*n)  # per cell, created on first use
+        for r in range(n):
+            for c in range(n):
+                x = PAD + c*cell; y = PAD + r*cell
+                self.rect_ids.append(cv.create_rectangle(x, y, x+cell, y+cell, fill="white", outline="#cccccc"))
         # Heavy grid lines
-        for i in range(SIZE+1):
-            w = 3 if i%3==0 else 1
+        for i in range(n+1):
+            w = 3 if i%self.box==0 else 1
             # horizontal
-            cv.create_line(PAD, PAD+i*CELL, PAD+SIZE*CELL, PAD+i*CELL, width=w)
+            cv.create_line(PAD, PAD+i*cell, PAD+n*cell, PAD+i*cell, width=w)
             # vertical
-            cv.create_line(PAD+i*CELL, PAD, PAD+i*CELL, PAD+SIZE*CELL, width=w)
+            cv.create_line(PAD+i*cell, PAD, PAD+i*cell, PAD+n*cell, width=w)
+        font = ("Helvetica", max(8, cell*20//CELL), "bold")
+        for r in range(n):
+            for c in range(n):
+                x = PAD + c*cell; y = PAD + r*cell
+                self.text_ids.append(cv.create_text(x+cell//2, y+cell//2, text="", font=font))
+        # What each cell currently shows: (fill, text, color, notes)
+        self.shown = [None] * (n*n)
+
+    def create_notes(self, i):
+        """Note items of cell i, one per digit laid out box x box."""
+        cv, k, cell = self.canvas, self.box, self.cell
+        r, c = divmod(i, self.size)
+        x = PAD + c*cell; y = PAD + r*cell
+        ids = []
+        for d in range(1, self.size+1):
+            rr = (d-1)//k; cc = (d-1)%k
+            nx = x + (cc+0.5)*(cell/k)
+            ny = y + (rr+0.5)*(cell/k)
+            ids.append(cv.create_text(nx, ny, text="", font=("Helvetica", max(5, 27//k)), fill="#666666"))
+        self.note_ids[i] = ids
+        return ids
 
-        # Numbers and notes
-        for r in range(SIZE):
-            for c in range(SIZE):
-                x = PAD + c*CELL; y = PAD + r*CELL
+    def draw(self):
+        """Bring the canvas up to date, touching only cells that changed."""
+        cv = self.canvas
+        n, k = self.size, self.box
+        rsel, csel = self.sel
+        bsel = (rsel//k, csel//k)
+        shown = self.shown
+        for r in range(n):
+            for c in range(n):
+                i = r*n + c
+                # Highlights for row/col/box
+                if (r, c) == self.sel:
+                    fill = "#e6f2ff"
+                elif (r//k, c//k) == bsel:
+                    fill = "#f6f0c0"
+                elif r == rsel or c == csel:
+                    fill = "#f9f6d2"
+                else:
+                    fill = "white"
                 v = self.values[r][c]
                 if v:
                     color = "#000000" if self.given[r][c] else "#1a4a8c"
                     if (r,c) in self.err_cells:
                         color = "#c71f37"
-                    cv.create_text(x+CELL//2, y+CELL//2, text=str(v), font=("Helvetica", 20, "bold"), fill=color)
+                    state = (fill, str(v), color, ())
                 else:
-                    notes = sorted(self.notes[r][c])
-                    if notes:
-                        # Render as 3x3 small digits
-                        for d in notes:
-                            rr = (d-1)//3; cc = (d-1)%3
-                            nx = x + (cc+0.5)*(CELL/3)
-                            ny = y + (rr+0.5)*(CELL/3)
-                            cv.create_text(nx, ny, text=str(d), font=("Helvetica", 9), fill="#666666")
+                    state = (fill, "", "#000000", tuple(sorted(self.notes[r][c])))
+                old = shown[i]
+                if old == state:
+                    continue
+                if old is None or old[0] != fill:
+                    cv.itemconfigure(self.rect_ids[i], fill=fill)
+                if old is None or old[1:3] != state[1:3]:
+                    cv.itemconfigure(self.text_ids[i], text=state[1], fill=state[2])
+                if (old[3] if old else ()) != state[3]:
+                    ids = self.note_ids[i] or self.create_notes(i)
+                    notes = set(state[3])
+                    for d, item in enumerate(ids, 1):
+                        cv.itemconfigure(item, text=str(d) if d in notes else "")
+                shown[i] = state
 
 def main():
     root = tk.Tk()
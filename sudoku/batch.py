@@ -0,0 +1,249 @@
+"""
+Vectorized batch propagation with NumPy (optional dependency).
+
+A batch of N puzzles is an (N, 81) uint8 array of digits (0 for blanks) and
+its candidates an (N, 81) uint16 array of the same 9-bit masks SudokuCSP
+uses. Naked and hidden singles are applied to the whole batch at once with
+bitwise array operations until nothing changes; only the puzzles left open
+fall back to the per-puzzle CSP search.
+
+    python -m sudoku solve puzzles.txt --batch --mrv --fc
+
+Packed corpora (sudoku/corpus.py) are unpacked straight from their mapping
+into the (N, 81) array, without building a string per puzzle.
+"""
+import time
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .corpus import PACKED, Corpus
+from .csp import CELL_UNITS, UNITS, solve_string
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this module needs it
+    np = None
+
+# propagate() status per puzzle
+CONTRADICTION = -1
+OPEN = 0
+SOLVED = 1
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("sudoku.batch requires NumPy (pip install numpy)")
+
+
+if np is not None:
+    _UNITS = np.array(UNITS, dtype=np.intp)                # (27, 9)
+    _CELL_UNITS = np.array(CELL_UNITS, dtype=np.intp)      # (81, 3)
+    # _BIT[v] -> mask of digit v, 0 for a blank
+    _BIT = np.array([0] + [1 << (d - 1) for d in range(1, 10)], dtype=np.uint16)
+    # _POPCOUNT[mask], _SINGLE[mask] -> digit if mask has exactly one bit, else 0
+    _POPCOUNT = np.array([bin(m).count("1") for m in range(512)], dtype=np.uint8)
+    _SINGLE = np.zeros(512, dtype=np.uint8)
+    for _d in range(1, 10):
+        _SINGLE[1 << (_d - 1)] = _d
+
+
+def to_array(puzzles: Sequence[str]):
+    """(N, 81) uint8 digits from 81-character puzzle strings."""
+    _require_numpy()
+    if not puzzles:
+        return np.zeros((0, 81), dtype=np.uint8)
+    raw = np.frombuffer("".join(puzzles).encode("ascii"), dtype=np.uint8)
+    return (raw - ord("0")).reshape(len(puzzles), 81)
+
+
+def from_records(buf, record_size: int = PACKED):
+    """
+    (N, 81) uint8 digits from packed corpus records.
+
+    Args:
+        buf: Buffer of whole records, e.g. Corpus.view(); read in place
+        record_size: Bytes per record (Corpus.record_size)
+
+    Raises:
+        ValueError: If a cell holds a nibble above 9 (a corrupt record)
+    """
+    _require_numpy()
+    packed = np.frombuffer(buf, dtype=np.uint8).reshape(-1, record_size)[:, :PACKED]
+    values = np.empty((len(packed), 2 * PACKED), dtype=np.uint8)
+    values[:, 0::2] = packed >> 4
+    values[:, 1::2] = packed & 0x0F
+    values = values[:, :81]
+    if (values > 9).any():
+        raise ValueError("corrupt corpus record: cell value above 9")
+    return values
+
+
+def to_strings(values) -> List[str]:
+    """81-character strings from (N, 81) digits."""
+    _require_numpy()
+    return [row.tobytes().decode("ascii") for row in (values + ord("0")).astype(np.uint8)]
+
+
+def _unit_or(masks):
+    """(N, 27) bitwise OR of masks over each unit."""
+    return np.bitwise_or.reduce(masks[:, _UNITS], axis=2)
+
+
+def candidates(values):
+    """
+    Candidate masks for a batch.
+
+    Args:
+        values: (N, 81) uint8 digits, 0 for blanks
+
+    Returns:
+        (N, 81) uint16 masks: the digit's own bit for a filled cell, else
+        every digit not placed in one of its units
+    """
+    _require_numpy()
+    placed = _BIT[values]
+    used = _unit_or(placed)
+    seen = used[:, _CELL_UNITS[:, 0]] | used[:, _CELL_UNITS[:, 1]] | used[:, _CELL_UNITS[:, 2]]
+    return np.where(values > 0, placed, ~seen & 0x1FF).astype(np.uint16)
+
+
+def _inconsistent(values, masks):
+    """(N,) True where a unit repeats a digit, a blank has no candidate, or
+    a digit has no place left in a unit."""
+    placed = _BIT[values]
+    # A repeated digit makes the OR of a unit's digits smaller than its count
+    repeated = (_POPCOUNT[_unit_or(placed)] != (values[:, _UNITS] > 0).sum(axis=2)).any(axis=1)
+    empty = ((masks == 0) & (values == 0)).any(axis=1)
+    missing = (_unit_or(masks) != 0x1FF).any(axis=1)
+    return repeated | empty | missing
+
+
+def _hidden(masks):
+    """(N, 81) mask of the digits each cell is the only place for in a unit."""
+    in_unit = masks[:, _UNITS]                             # (N, 27, 9)
+    once = np.zeros(in_unit.shape[:2], dtype=np.uint16)
+    twice = np.zeros_like(once)
+    # Same once/twice accumulation as SudokuCSP.hidden_singles, per unit
+    for k in range(9):
+        m = in_unit[:, :, k]
+        twice |= once & m
+        once |= m
+    once &= ~twice
+    return masks & (once[:, _CELL_UNITS[:, 0]] | once[:, _CELL_UNITS[:, 1]]
+                    | once[:, _CELL_UNITS[:, 2]])
+
+
+def propagate(values) -> Tuple[Any, Any, Any]:
+    """
+    Apply naked and hidden singles to every puzzle of a batch until none
+    changes any more.
+
+    Each round recomputes candidates for the puzzles still moving and fills
+    every cell left with one candidate or holding a digit no other cell of
+    one of its units can take.
+
+    Args:
+        values: (N, 81) uint8 digits, 0 for blanks (not modified)
+
+    Returns:
+        (values, masks, status): the filled-in digits, their candidate masks
+        and an (N,) int8 array of SOLVED, OPEN or CONTRADICTION
+    """
+    _require_numpy()
+    values = np.array(values, dtype=np.uint8)
+    masks = candidates(values)
+    status = np.full(len(values), OPEN, dtype=np.int8)
+    active = np.arange(len(values))
+    while active.size:
+        v, m = values[active], masks[active]
+        bad = _inconsistent(v, m)
+        status[active[bad]] = CONTRADICTION
+        keep = ~bad
+        active, v, m = active[keep], v[keep], m[keep]
+
+        blank = v == 0
+        naked = np.where(blank, _SINGLE[m], 0)
+        hidden = np.where(blank & (naked == 0), _hidden(m), 0)
+        # A cell that is the only place for two digits is a contradiction
+        clash = (hidden != 0) & (_POPCOUNT[hidden] > 1)
+        forced = naked | _SINGLE[hidden]
+        clash_rows = clash.any(axis=1)
+        status[active[clash_rows]] = CONTRADICTION
+
+        moved = (forced != 0).any(axis=1) & ~clash_rows
+        done = ~blank.any(axis=1) & ~clash_rows
+        status[active[done]] = SOLVED
+
+        v = np.where(forced != 0, forced, v).astype(np.uint8)
+        values[active[moved]] = v[moved]
+        active = active[moved]
+        if active.size:
+            masks[active] = candidates(values[active])
+    return values, masks, status
+
+
+def solve_batch(puzzles: Sequence[str], **opts: Any) -> List[Optional[str]]:
+    """
+    Solve a batch: vectorized propagation first, CSP search for the rest.
+
+    Args:
+        puzzles: 81-character puzzle strings ('0' for blanks)
+        **opts: Keyword options for solve(), used for the puzzles that
+            propagation leaves open
+
+    Returns:
+        Solutions as 81-character strings (None where unsolvable), in order
+    """
+    return _solve_values(to_array(puzzles), **opts)
+
+
+def _solve_values(values, **opts: Any) -> List[Optional[str]]:
+    """solve_batch() for an (N, 81) digit array."""
+    values, _, status = propagate(values)
+    results: List[Optional[str]] = []
+    for puzzle, state in zip(to_strings(values), status):
+        if state == SOLVED:
+            results.append(puzzle)
+        elif state == CONTRADICTION:
+            results.append(None)
+        else:
+            results.append(solve_string(puzzle, **opts))
+    return results
+
+
+def iter_solve(puzzles: Iterable[str], *, chunksize: int = 4096,
+               **opts: Any) -> Iterator[Tuple[Optional[str], float]]:
+    """
+    Lazily solve a stream of puzzles in batches of chunksize.
+
+    Yields:
+        (solution or None, seconds) per puzzle in input order, where seconds
+        is the batch time split evenly over its puzzles
+    """
+    _require_numpy()
+    chunk: List[str] = []
+    source = iter(puzzles)
+    while True:
+        chunk = [p for _, p in zip(range(chunksize), source)]
+        if not chunk:
+            return
+        t0 = time.perf_counter()
+        solutions = solve_batch(chunk, **opts)
+        share = (time.perf_counter() - t0) / len(chunk)
+        for sol in solutions:
+            yield sol, share
+
+
+def iter_solve_corpus(corpus: Corpus, *, chunksize: int = 4096,
+                      **opts: Any) -> Iterator[Tuple[Optional[str], float]]:
+    """
+    iter_solve() over a packed corpus, unpacking each batch of records
+    straight from the mapping with from_records().
+    """
+    _require_numpy()
+    for start in range(0, len(corpus), chunksize):
+        t0 = time.perf_counter()
+        values = from_records(corpus.view(start, start + chunksize), corpus.record_size)
+        solutions = _solve_values(values, **opts)
+        share = (time.perf_counter() - t0) / len(solutions)
+        for sol in solutions:
+            yield sol, share
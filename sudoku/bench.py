@@ -0,0 +1,239 @@
+"""
+Benchmark harness: every combination of the four core solve() flags over the
+bundled PUZZLES (plus optional puzzle files), reported as JSON.
+
+    python -m sudoku bench [--file more.txt] [--repeat 3] [--warmup 1] [-o bench.json]
+    python -m sudoku bench --cache --generate 40 [--seed 1] [-o cache.json]
+"""
+import itertools
+import math
+import platform
+import random
+import statistics
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .cache import SolutionCache, canonical_form, transform
+from .csp import SearchStats, parse_puzzle, solve, solve_string, to_grid
+from .puzzles import PUZZLES
+
+FLAGS = ("use_mrv", "use_lcv", "use_fc", "use_ac3")
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending sequence (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class LatencyHistogram:
+    """
+    Streaming latency percentiles in constant memory.
+
+    Samples fall into log-scale buckets, BUCKETS_PER_DECADE per factor of
+    ten from MIN_SECONDS up to MIN_SECONDS * 10 ** DECADES; nothing else is
+    kept, however long the stream. quantile() reports the upper edge of the
+    bucket holding the nearest-rank sample, so it overstates the exact
+    percentile() by at most 10 ** (1 / BUCKETS_PER_DECADE), about 2.3%.
+
+    Attributes:
+        count: Samples added
+        max: Largest sample added (reported for the overflow bucket)
+    """
+
+    MIN_SECONDS = 1e-6
+    DECADES = 8
+    BUCKETS_PER_DECADE = 100
+
+    def __init__(self):
+        # Bucket 0 holds samples up to MIN_SECONDS, the last one everything
+        # past the top edge
+        self.counts = [0] * (self.DECADES * self.BUCKETS_PER_DECADE + 2)
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        """Record one sample."""
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+        if seconds <= self.MIN_SECONDS:
+            i = 0
+        else:
+            i = math.ceil(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE)
+            i = min(i, len(self.counts) - 1)
+        self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """Nearest-rank percentile q (0-1), as percentile() (0 when empty)."""
+        if not self.count:
+            return 0.0
+        k = min(self.count - 1, max(0, round(q * self.count) - 1))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen > k:
+                break
+        if i == len(self.counts) - 1:
+            return self.max
+        edge = self.MIN_SECONDS * 10 ** (i / self.BUCKETS_PER_DECADE)
+        return min(edge, self.max)
+
+
+def all_configs() -> List[Dict[str, bool]]:
+    """The 16 on/off combinations of FLAGS, all-off first."""
+    return [dict(zip(FLAGS, bits)) for bits in itertools.product((False, True), repeat=len(FLAGS))]
+
+
+def load_puzzles(paths: Iterable[str] = ()) -> List[str]:
+    """PUZZLES followed by every valid puzzle line of each file in paths."""
+    puzzles = list(PUZZLES)
+    for path in paths:
+        with open(path) as f:
+            puzzles.extend(p for p in map(parse_puzzle, f) if p is not None)
+    return puzzles
+
+
+def bench_config(puzzles: Sequence[str], opts: Dict[str, Any], *,
+                 repeat: int = 3, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time one configuration over puzzles.
+
+    Each puzzle is solved warmup times untimed, then repeat times timed; its
+    time is the median of those runs. Node and backtrack counts come from one
+    instrumented run per puzzle, outside the timed runs.
+
+    Args:
+        puzzles: 81-character puzzle strings
+        opts: Keyword options for solve()
+        repeat: Timed runs per puzzle
+        warmup: Untimed runs per puzzle
+
+    Returns:
+        Per-configuration summary (times in milliseconds)
+    """
+    times: List[float] = []
+    nodes: List[int] = []
+    backtracks: List[int] = []
+    solved = 0
+    for puzzle in puzzles:
+        grid = to_grid(puzzle)
+        for _ in range(warmup):
+            solve(grid, **opts)
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            solve(grid, **opts)
+            runs.append(time.perf_counter() - t0)
+        times.append(statistics.median(runs) * 1000)
+
+        stats = SearchStats()
+        if solve(grid, stats=stats, **opts) is not None:
+            solved += 1
+        nodes.append(stats.nodes)
+        backtracks.append(stats.backtracks)
+
+    times.sort()
+    return {
+        "options": opts,
+        "puzzles": len(puzzles),
+        "solved": solved,
+        "total_ms": sum(times),
+        "median_ms": percentile(times, 0.50),
+        "p95_ms": percentile(times, 0.95),
+        "max_ms": times[-1] if times else 0.0,
+        "nodes": sum(nodes),
+        "median_nodes": statistics.median(nodes) if nodes else 0,
+        "backtracks": sum(backtracks),
+        "median_backtracks": statistics.median(backtracks) if backtracks else 0,
+    }
+
+
+def run(puzzles: Sequence[str], *, configs: Optional[Sequence[Dict[str, Any]]] = None,
+        repeat: int = 3, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Benchmark configs (default: all_configs()) over puzzles.
+
+    Returns:
+        JSON-serializable report with environment metadata and one entry per
+        configuration
+    """
+    if configs is None:
+        configs = all_configs()
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": repeat,
+        "warmup": warmup,
+        "puzzles": len(puzzles),
+        "results": [bench_config(puzzles, opts, repeat=repeat, warmup=warmup) for opts in configs],
+    }
+
+
+def _timed(fn, repeat: int) -> float:
+    """Median milliseconds of repeat calls of fn."""
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return statistics.median(runs) * 1000
+
+
+def _summary(times: List[float]) -> Dict[str, float]:
+    times = sorted(times)
+    return {
+        "median_ms": percentile(times, 0.50),
+        "p95_ms": percentile(times, 0.95),
+        "max_ms": times[-1] if times else 0.0,
+    }
+
+
+def run_cache(puzzles: Sequence[str], *, repeat: int = 3, seed: int = 0,
+              opts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Compare a canonical-form cache hit with solving from scratch.
+
+    For each puzzle the cache is warmed with the puzzle, then asked for
+    repeat random equivalents of it (see cache.transform), each of which
+    misses the exact LRU and is answered through canonical_form(). The
+    equivalents are also solved with opts (default MRV + FC).
+
+    Returns:
+        JSON-serializable report with hit, canonicalization and solve times
+    """
+    if opts is None:
+        opts = dict(use_mrv=True, use_fc=True)
+    rng = random.Random(seed)
+    solver = lambda puzzle: solve_string(puzzle, **opts)
+    hits, canon, solves = [], [], []
+    canonical_hits = 0
+    for puzzle in puzzles:
+        variants = [transform(puzzle, rng) for _ in range(repeat)]
+        cache = SolutionCache()
+        cache.solve(puzzle, solver)
+        variant = iter(variants)
+        hits.append(_timed(lambda: cache.solve(next(variant), solver), repeat))
+        canonical_hits += cache.hits
+        variant = iter(variants)
+        canon.append(_timed(lambda: canonical_form(next(variant)), repeat))
+        variant = iter(variants)
+        solves.append(_timed(lambda: solver(next(variant)), repeat))
+    faster = sum(h < t for h, t in zip(hits, solves))
+    return {
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "puzzles": len(puzzles),
+        "repeat": repeat,
+        "options": opts,
+        "lookups": len(puzzles) * repeat,
+        "canonical_hits": canonical_hits,
+        "hit_faster_than_solve": faster,
+        "cache_hit": _summary(hits),
+        "canonical_form": _summary(canon),
+        "solve": _summary(solves),
+    }
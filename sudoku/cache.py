@@ -0,0 +1,245 @@
+"""
+LRU solution cache keyed by a canonical form of the puzzle.
+
+Puzzles that are rotations, reflections, band/stack or row/column-within-band
+permutations, or digit relabelings of each other have the same solution up
+to the same transform. SolutionCache stores one solution per canonical
+form and maps it back through the inverse transform, so a single search
+answers every puzzle in the class.
+
+Exact repeats are answered from a second LRU keyed by the raw puzzle
+string, without canonicalizing at all.
+"""
+import random
+from collections import OrderedDict
+from itertools import islice, permutations, product
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Canonicalization tries at most this many (row order, column order)
+# pairs in all, split between the two orientations, when refinement leaves
+# rows or columns tied. Past the cap the form may differ between
+# equivalent puzzles, which only costs a miss.
+MAX_ORDERS = 16
+
+# Refinement rounds before giving up on separating rows and columns further
+MAX_ROUNDS = 6
+
+# The other two lines of the band or stack, for the 9 rows then 9 columns
+_MATES = [[j for j in range(i - i % 3, i - i % 3 + 3) if j != i] for i in range(18)]
+
+# The cell order of the transposed grid
+_TRANSPOSE = itemgetter(*(c * 9 + r for r in range(9) for c in range(9)))
+
+
+def _orders(keys: Sequence[int]) -> List[List[int]]:
+    """
+    Orders of the 9 lines that sort them by keys within each band and the
+    bands by their sorted keys, enumerating every arrangement of tied lines
+    (capped at MAX_ORDERS).
+    """
+    bands = [sorted(range(b * 3, b * 3 + 3), key=keys.__getitem__) for b in range(3)]
+    band_keys = [tuple(keys[i] for i in band) for band in bands]
+    if len(set(keys)) == 9:
+        # No ties: the usual case after refinement
+        return [sum(sorted(bands, key=lambda band: band_keys[band[0] // 3]), [])]
+    within = [[list(p) for p in permutations(band)
+               if all(keys[p[i]] == keys[band[i]] for i in range(3))] for band in bands]
+    ranked = sorted(band_keys)
+    band_orders = [p for p in permutations(range(3))
+                   if all(band_keys[p[i]] == ranked[i] for i in range(3))]
+    orders = (sum(choice, []) for p in band_orders
+              for choice in product(*(within[b] for b in p)))
+    return list(islice(orders, MAX_ORDERS))
+
+
+def _refine(puzzle: str) -> Tuple[List[int], List[int]]:
+    """
+    Colour rows and columns by iterated invariants, so lines that no
+    symmetry can exchange end up with different colours.
+
+    A line's colour is refined from the colours of the crossing lines and
+    digits at its givens and the colours of its band (or stack) mates; a
+    digit's from the lines it is placed on. Rows and columns share one
+    palette and every rule treats them alike, so transposing the puzzle
+    swaps the two lists. Colours are hashes of these signatures, which
+    depend on nothing but the signatures themselves.
+
+    Rounds stop once rows and columns are each fully separated or a round
+    separates nothing new.
+
+    Returns:
+        (row colours, column colours)
+    """
+    givens = [(i // 9, i % 9, ch) for i, ch in enumerate(puzzle) if ch != "0"]
+    digit = dict.fromkeys("123456789", 0)
+    for _, _, d in givens:
+        digit[d] += 1
+    rows, cols = [0] * 9, [0] * 9
+    distinct = 0
+    for _ in range(MAX_ROUNDS):
+        row_cells: List[List[int]] = [[] for _ in range(9)]
+        col_cells: List[List[int]] = [[] for _ in range(9)]
+        digit_cells: Dict[str, List[int]] = {d: [] for d in digit}
+        for r, c, d in givens:
+            a, b, colour = rows[r], cols[c], digit[d]
+            row_cells[r].append(hash((b, colour)))
+            col_cells[c].append(hash((a, colour)))
+            # Unordered pair: the digit must not tell rows from columns either
+            digit_cells[d].append(hash((a, b) if a < b else (b, a)))
+        lines = [hash((rows[i], tuple(sorted(row_cells[i])))) for i in range(9)]
+        lines += [hash((cols[i], tuple(sorted(col_cells[i])))) for i in range(9)]
+        # Fold in the other two lines of the band or stack
+        lines = [hash((h,) + tuple(sorted(lines[j] for j in _MATES[i]))) for i, h in enumerate(lines)]
+        rows, cols = lines[:9], lines[9:]
+        digit = {d: hash((digit[d], tuple(sorted(cells)))) for d, cells in digit_cells.items()}
+        separated_rows, separated_cols = len(set(rows)), len(set(cols))
+        if separated_rows == 9 and separated_cols == 9:
+            break
+        count = separated_rows + separated_cols + len(set(digit.values()))
+        if count == distinct:
+            break
+        distinct = count
+    return rows, cols
+
+
+def _relabel_table(text: str) -> Dict[int, int]:
+    """str.translate table renaming digits 1-9 in order of first appearance."""
+    seen = "".join(dict.fromkeys(text.replace("0", "") + "123456789"))
+    return str.maketrans(seen, "123456789")
+
+
+def transform(puzzle: str, rng: random.Random) -> str:
+    """
+    A random puzzle equivalent to puzzle: an optional transposition, random
+    band, stack, row and column permutations and a random digit relabeling.
+    """
+    text = "".join(_TRANSPOSE(puzzle)) if rng.random() < 0.5 else puzzle
+    rows = [b * 3 + i for b in rng.sample(range(3), 3) for i in rng.sample(range(3), 3)]
+    cols = [s * 3 + i for s in rng.sample(range(3), 3) for i in rng.sample(range(3), 3)]
+    table = str.maketrans("123456789", "".join(rng.sample("123456789", 9)))
+    return "".join(text[r * 9 + c] for r in rows for c in cols).translate(table)
+
+
+def canonical_form(puzzle: str) -> Tuple[str, List[int], List[str]]:
+    """
+    Canonical representative of puzzle under the Sudoku symmetry group.
+
+    Rows and columns are ordered by colours from _refine(), which no
+    symmetry changes; lines still tied are ordered every possible way (up
+    to MAX_ORDERS pairs of orders in all), and digits are renamed by first
+    appearance. The lexicographically smallest result over both
+    orientations wins.
+
+    Args:
+        puzzle: 81 digits, '0' for blanks
+
+    Returns:
+        (form, cells, mapping) with form[i] == mapping[int(puzzle[cells[i]])]
+    """
+    row_colours, col_colours = _refine(puzzle)
+    transposed = "".join(_TRANSPOSE(puzzle))
+    best: Optional[Tuple[str, Tuple[List[int], List[int]], bool, Dict[int, int]]] = None
+    row_orders, col_orders = _orders(row_colours), _orders(col_colours)
+    for transpose in (False, True):
+        if transpose:
+            text, pairs = transposed, product(col_orders, row_orders)
+        else:
+            text, pairs = puzzle, product(row_orders, col_orders)
+        lines = [text[r * 9:r * 9 + 9] for r in range(9)]
+        for rows, cols in islice(pairs, MAX_ORDERS // 2):
+            pick = itemgetter(*cols)
+            permuted = "".join(["".join(pick(lines[r])) for r in rows])
+            table = _relabel_table(permuted)
+            form = permuted.translate(table)
+            if best is None or form < best[0]:
+                best = (form, (rows, cols), transpose, table)
+
+    form, (rows, cols), transpose, table = best
+    # Cell indices of the untransposed puzzle, in form order
+    if transpose:
+        cells = [c * 9 + r for r in rows for c in cols]
+    else:
+        cells = [r * 9 + c for r in rows for c in cols]
+    mapping = ["0"] + [chr(table[ord(d)]) for d in "123456789"]
+    return form, cells, mapping
+
+
+class SolutionCache:
+    """
+    Bounded LRU cache of solutions in front of a solver.
+
+    Attributes:
+        maxsize: Entries kept per LRU (exact and canonical)
+        hits: Lookups answered from the cache
+        misses: Lookups that ran the solver
+        evictions: Entries dropped to stay within maxsize
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._exact: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._canonical: "OrderedDict[str, Optional[str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def _put(self, table: "OrderedDict[str, Optional[str]]", key: str, value: Optional[str]):
+        table[key] = value
+        if len(table) > self.maxsize:
+            table.popitem(last=False)
+            self.evictions += 1
+
+    def solve(self, puzzle: str, solver: Callable[[str], Optional[str]]) -> Optional[str]:
+        """
+        Solution of puzzle from the cache, or from solver on a miss.
+
+        Args:
+            puzzle: 81 digits, '0' for blanks
+            solver: Maps an 81-digit puzzle to its 81-digit solution or None;
+                called with the canonical form on a miss
+
+        Returns:
+            The 81-digit solution, or None if solver found none
+        """
+        exact = self._exact
+        if puzzle in exact:
+            exact.move_to_end(puzzle)
+            self.hits += 1
+            return exact[puzzle]
+
+        form, cells, mapping = canonical_form(puzzle)
+        canonical = self._canonical
+        if form in canonical:
+            canonical.move_to_end(form)
+            self.hits += 1
+            solved = canonical[form]
+        else:
+            self.misses += 1
+            solved = solver(form)
+            self._put(canonical, form, solved)
+
+        if solved is None:
+            solution = None
+        else:
+            inverse = {label: d for d, label in enumerate(mapping)}
+            out = [""] * 81
+            for i, ch in enumerate(solved):
+                out[cells[i]] = str(inverse[ch])
+            solution = "".join(out)
+        self._put(exact, puzzle, solution)
+        return solution
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._exact.clear()
+        self._canonical.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> Dict[str, int]:
+        """Counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self._canonical), "maxsize": self.maxsize}
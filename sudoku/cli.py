@@ -0,0 +1,298 @@
+"""
+Headless command line for the solver.
+
+    python -m sudoku solve [FILE] [--mrv --lcv --fc --ac3 ...] [--workers N] [--stats]
+    python -m sudoku solve [FILE] --portfolio [--workers N] [--winners OUT] [--stats]
+    python -m sudoku bench [--file FILE ...] [--repeat N] [--warmup N] [-o OUT]
+    python -m sudoku bench --cache [--generate N] [--seed N] [-o OUT]
+    python -m sudoku generate COUNT [--seed N] [--workers N] [--symmetric] [-o OUT]
+    python -m sudoku pack [FILE] -o CORPUS [--solutions]
+    python -m sudoku unpack CORPUS [-o OUT]
+
+Puzzles are read one per line (stdin when FILE is omitted or '-') with
+csp.parse_puzzle: non-digits are dropped and exactly 81 digits must remain.
+The GUI import (csp.parse_tokens) accepts every such line too. Each valid puzzle produces one output line holding the
+81-digit solution, or "unsolvable". Malformed lines are reported on stderr
+and skipped.
+
+generate writes one puzzle per line followed by its grade, which the solve
+command reads back as is. pack converts such files to the binary corpus
+format of sudoku/corpus.py, which solve also accepts as FILE.
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from . import bench, corpus, generator
+from .cache import SolutionCache
+from .csp import iter_solve, parse_puzzle
+
+# Output lines buffered before each write
+FLUSH_EVERY = 1024
+
+
+def _read_puzzles(lines: TextIO, bad: List[int]) -> Iterator[str]:
+    """Yield parsed puzzles from lines, recording malformed line numbers in bad."""
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        puzzle = parse_puzzle(line)
+        if puzzle is None:
+            bad.append(lineno)
+            print(f"line {lineno}: expected 81 digits", file=sys.stderr)
+            continue
+        yield puzzle
+
+
+def cmd_solve(args: argparse.Namespace) -> int:
+    """Stream-solve puzzles from args.file to args.output."""
+    opts = dict(
+        use_mrv=args.mrv,
+        use_lcv=args.lcv,
+        use_fc=args.fc,
+        use_ac3=args.ac3,
+        use_mac=args.mac,
+        use_hidden_singles=args.hidden_singles,
+        use_naked_subsets=args.naked_subsets,
+        use_box_line=args.box_line,
+        use_degree=args.degree,
+        use_cbj=args.cbj,
+        engine=args.engine,
+    )
+    if args.cache:
+        opts["cache"] = SolutionCache(args.cache)
+    if args.file != "-" and corpus.is_corpus(args.file):
+        src = corpus.Corpus(args.file)
+    else:
+        src = sys.stdin if args.file == "-" else open(args.file)
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    winners = open(args.winners, "w") if args.winners else None
+    racer = None
+    bad: List[int] = []
+    latencies = bench.LatencyHistogram()
+    solved = total = 0
+    buf: List[str] = []
+    t0 = time.perf_counter()
+    try:
+        puzzles = iter(src) if isinstance(src, corpus.Corpus) else _read_puzzles(src, bad)
+        if args.portfolio:
+            from .portfolio import PortfolioSolver
+            racer = PortfolioSolver(workers=args.workers if args.workers > 1 else None)
+            results = _raced(racer, puzzles, winners)
+        elif args.batch:
+            from . import batch
+            if isinstance(src, corpus.Corpus):
+                results = batch.iter_solve_corpus(src, **opts)
+            else:
+                results = batch.iter_solve(puzzles, **opts)
+        else:
+            results = iter_solve(puzzles, workers=args.workers,
+                                 chunksize=args.chunksize, **opts)
+        for sol, seconds in results:
+            total += 1
+            if sol is not None:
+                solved += 1
+            if args.stats and not args.batch:
+                latencies.add(seconds)
+            buf.append((sol or "unsolvable") + "\n")
+            if len(buf) >= FLUSH_EVERY:
+                out.write("".join(buf))
+                buf.clear()
+        out.write("".join(buf))
+        out.flush()
+    finally:
+        if racer is not None:
+            racer.close()
+        if winners is not None:
+            winners.close()
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+
+    if args.stats:
+        rate = total / elapsed if elapsed > 0 else 0.0
+        print(f"puzzles: {total}  solved: {solved}  unsolvable: {total - solved}  "
+              f"malformed: {len(bad)}", file=sys.stderr)
+        print(f"elapsed: {elapsed:.3f} s  throughput: {rate:.1f} puzzles/s", file=sys.stderr)
+        if args.batch:
+            # Batches are solved as a whole, so there are no per-puzzle times
+            mean = elapsed / total if total else 0.0
+            print(f"latency: {mean * 1000:.3f} ms mean (no percentiles with --batch)",
+                  file=sys.stderr)
+        else:
+            print(f"latency p50: {latencies.quantile(0.50) * 1000:.3f} ms  "
+                  f"p99: {latencies.quantile(0.99) * 1000:.3f} ms", file=sys.stderr)
+        if args.cache and args.workers <= 1:
+            info = opts["cache"].info()
+            print(f"cache hits: {info['hits']}  misses: {info['misses']}  "
+                  f"evictions: {info['evictions']}", file=sys.stderr)
+        if racer is not None:
+            print("wins: " + "  ".join(f"{name}: {n}" for name, n in racer.wins.items()),
+                  file=sys.stderr)
+    return 1 if bad else 0
+
+
+def _raced(racer, puzzles: Iterator[str],
+           winners: Optional[TextIO]) -> Iterator[Tuple[Optional[str], float]]:
+    """PortfolioSolver.iter_solve() results, logging each winner to winners."""
+    for sol, seconds, name in racer.iter_solve(puzzles):
+        if winners is not None:
+            winners.write(f"{name} {seconds * 1000:.3f}\n")
+        yield sol, seconds
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Benchmark all flag combinations (or the solution cache) and write the JSON report."""
+    puzzles = bench.load_puzzles(args.file)
+    if args.generate:
+        puzzles += [rec["puzzle"] for rec in generator.generate_many(args.generate, seed=args.seed,
+                                                                     workers=1)]
+    if args.cache:
+        report = bench.run_cache(puzzles, repeat=args.repeat, seed=args.seed or 0)
+    else:
+        report = bench.run(puzzles, repeat=args.repeat, warmup=args.warmup)
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+def cmd_generate(args: argparse.Namespace) -> int:
+    """Generate args.count graded puzzles to args.output."""
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    buf: List[str] = []
+    try:
+        for rec in generator.generate_many(args.count, seed=args.seed, workers=args.workers,
+                                           chunksize=args.chunksize, min_givens=args.min_givens,
+                                           symmetric=args.symmetric):
+            buf.append(f"{rec['puzzle']} {rec['grade']}\n")
+            if len(buf) >= FLUSH_EVERY:
+                out.write("".join(buf))
+                buf.clear()
+        out.write("".join(buf))
+        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def cmd_pack(args: argparse.Namespace) -> int:
+    """Pack line-based puzzles from args.file into the corpus args.output."""
+    src = sys.stdin if args.file == "-" else open(args.file)
+    bad: List[int] = []
+    try:
+        count = corpus.from_text(src, args.output, solutions=args.solutions, bad=bad)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    for lineno in bad:
+        print(f"line {lineno}: expected 81 or 162 digits", file=sys.stderr)
+    print(f"packed {count} puzzles into {args.output}", file=sys.stderr)
+    return 1 if bad else 0
+
+
+def cmd_unpack(args: argparse.Namespace) -> int:
+    """Write the corpus args.file back out as text lines."""
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        with corpus.Corpus(args.file) as src:
+            corpus.to_text(src, out)
+        out.flush()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for `python -m sudoku`."""
+    parser = argparse.ArgumentParser(prog="python -m sudoku", description="Sudoku CSP solver")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("solve", help="solve puzzles line by line")
+    p.add_argument("file", nargs="?", default="-", help="puzzle file, one per line, or a packed corpus (default: stdin)")
+    p.add_argument("-o", "--output", default="-", help="solution file (default: stdout)")
+    p.add_argument("--mrv", action="store_true", help="Minimum Remaining Values")
+    p.add_argument("--lcv", action="store_true", help="Least Constraining Value")
+    p.add_argument("--fc", action="store_true", help="Forward Checking")
+    p.add_argument("--ac3", action="store_true", help="AC-3 preprocessing")
+    p.add_argument("--mac", action="store_true", help="Maintain arc consistency during search")
+    p.add_argument("--hidden-singles", action="store_true", help="hidden singles propagation")
+    p.add_argument("--naked-subsets", action="store_true", help="naked pairs/triples propagation")
+    p.add_argument("--box-line", action="store_true", help="pointing/claiming propagation")
+    p.add_argument("--degree", action="store_true", help="break MRV ties by degree")
+    p.add_argument("--cbj", action="store_true",
+                   help="conflict-directed backjumping with nogood learning (csp engine)")
+    p.add_argument("--engine", choices=("csp", "iterative", "dlx"), default="csp")
+    p.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    p.add_argument("--chunksize", type=int, default=64, help="puzzles per worker task")
+    p.add_argument("--batch", action="store_true",
+                   help="propagate singles over whole batches with NumPy first "
+                        "(in-process; ignores --workers)")
+    p.add_argument("--cache", type=int, default=0, metavar="N",
+                   help="keep up to N solutions, shared across symmetric puzzles")
+    p.add_argument("--portfolio", action="store_true",
+                   help="race the configurations of sudoku.portfolio.PORTFOLIO, one process "
+                        "each (--workers caps how many); ignores the solver flags")
+    p.add_argument("--winners", default=None, metavar="OUT",
+                   help="with --portfolio, write the winning configuration and ms per puzzle")
+    p.add_argument("--stats", action="store_true",
+                   help="print throughput and p50/p99 latency to stderr (mean "
+                        "latency with --batch)")
+    p.set_defaults(func=cmd_solve)
+
+    p = sub.add_parser("bench", help="benchmark every MRV/LCV/FC/AC-3 combination")
+    p.add_argument("--file", action="append", default=[],
+                   help="extra puzzle file to include (repeatable)")
+    p.add_argument("--repeat", type=int, default=3, help="timed runs per puzzle (default: 3)")
+    p.add_argument("--warmup", type=int, default=1, help="untimed runs per puzzle (default: 1)")
+    p.add_argument("--generate", type=int, default=0, metavar="N",
+                   help="also benchmark N generated puzzles")
+    p.add_argument("--seed", type=int, default=None, help="seed for --generate and --cache")
+    p.add_argument("--cache", action="store_true",
+                   help="time canonical-form cache hits against MRV+FC solves instead")
+    p.add_argument("-o", "--output", default="-", help="JSON report path (default: stdout)")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("generate", help="generate graded puzzles with unique solutions")
+    p.add_argument("count", type=int, help="number of puzzles")
+    p.add_argument("--seed", type=int, default=None, help="master seed for reproducible output")
+    p.add_argument("--min-givens", type=int, default=17, help="stop removing givens here")
+    p.add_argument("--symmetric", action="store_true", help="keep givens symmetric")
+    p.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+    p.add_argument("--chunksize", type=int, default=8, help="puzzles per worker task")
+    p.add_argument("-o", "--output", default="-", help="puzzle file (default: stdout)")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("pack", help="convert puzzle lines to a binary corpus")
+    p.add_argument("file", nargs="?", default="-", help="puzzle file, one per line (default: stdin)")
+    p.add_argument("-o", "--output", required=True, help="corpus file to write")
+    p.add_argument("--solutions", action="store_true",
+                   help="also store solutions given as 81 more digits on the line")
+    p.set_defaults(func=cmd_pack)
+
+    p = sub.add_parser("unpack", help="convert a binary corpus back to puzzle lines")
+    p.add_argument("file", help="corpus file")
+    p.add_argument("-o", "--output", default="-", help="puzzle file (default: stdout)")
+    p.set_defaults(func=cmd_unpack)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for `python -m sudoku`."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "solve" and args.cbj and args.engine != "csp":
+        parser.error("--cbj needs --engine csp")
+    return args.func(args)
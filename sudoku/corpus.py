@@ -0,0 +1,299 @@
+"""
+Compact binary puzzle corpus, opened with mmap for O(1) random access.
+
+    python -m sudoku pack puzzles.txt -o puzzles.sdk [--solutions]
+    python -m sudoku unpack puzzles.sdk -o puzzles.txt
+    python -m sudoku solve puzzles.sdk --batch --mrv --fc
+
+A corpus is a 16-byte header followed by fixed-size records:
+
+    magic    4 bytes   b"SDKC"
+    version  1 byte    VERSION
+    flags    1 byte    HAS_SOLUTIONS
+    record   2 bytes   record size in bytes, little-endian
+    count    8 bytes   number of records, little-endian
+
+Each record packs the 81 cells of a puzzle at 4 bits per cell, two per byte
+with the first cell in the high nibble, into PACKED (41) bytes. When
+HAS_SOLUTIONS is set the packed solution follows in another PACKED bytes;
+an all-zero solution means none was stored for that puzzle.
+
+Packing is bytes.fromhex() of the digit string and unpacking is .hex() of
+the record, so neither goes through per-cell Python code, and a record is
+read straight from the mapping without loading the rest of the file.
+"""
+import mmap
+import struct
+from typing import IO, Iterable, Iterator, Optional, TextIO, Tuple
+
+MAGIC = b"SDKC"
+VERSION = 1
+HAS_SOLUTIONS = 0x01
+
+HEADER = struct.Struct("<4sBBHQ")
+PACKED = 41  # bytes per packed 81-cell grid
+_EMPTY = bytes(PACKED)
+
+
+def pack(puzzle: str) -> bytes:
+    """
+    81 digits ('0' for blanks) -> PACKED bytes.
+
+    Raises:
+        ValueError: If puzzle is not exactly 81 ASCII digits (fromhex()
+            alone would also take the letters a-f)
+    """
+    if len(puzzle) != 81 or not (puzzle.isascii() and puzzle.isdigit()):
+        raise ValueError("expected 81 digits")
+    return bytes.fromhex(puzzle + "0")
+
+
+def unpack(record) -> str:
+    """
+    PACKED bytes (or a memoryview of them) -> 81 digits.
+
+    Raises:
+        ValueError: If a cell holds a nibble above 9 (a corrupt record)
+    """
+    digits = record.hex()[:81]
+    if not digits.isdigit():
+        raise ValueError("corrupt corpus record: cell value above 9")
+    return digits
+
+
+def is_corpus(path: str) -> bool:
+    """True if the file at path starts with the corpus magic."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class Corpus:
+    """
+    Read-only view of a corpus file through mmap.
+
+    Indexing returns the puzzle as 81 digits; nothing is read until a record
+    is touched, so opening a corpus of any size is O(1).
+
+    Attributes:
+        path: File the corpus was opened from
+        record_size: Bytes per record (PACKED, or 2 * PACKED with solutions)
+        has_solutions: Whether records carry a packed solution
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"{path}: not a puzzle corpus")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: not a puzzle corpus")
+        magic, version, flags, self.record_size, self._count = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a puzzle corpus (or unsupported version)")
+        self.has_solutions = bool(flags & HAS_SOLUTIONS)
+        if self.record_size != (2 * PACKED if self.has_solutions else PACKED):
+            self.close()
+            raise ValueError(f"{path}: bad record size {self.record_size}")
+        if len(self._map) < HEADER.size + self._count * self.record_size:
+            self.close()
+            raise ValueError(f"{path}: truncated corpus")
+        self._view = memoryview(self._map)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self):
+        """
+        Release the mapping and the file.
+
+        Memoryviews returned by view() that are still alive keep the mapping
+        open: it is then unmapped once the last of them is released or
+        garbage collected. The file itself is always closed here.
+        """
+        try:
+            view = getattr(self, "_view", None)
+            if view is not None:
+                self._view = None
+                view.release()
+            if self._map is not None:
+                mapping, self._map = self._map, None
+                try:
+                    mapping.close()
+                except BufferError:
+                    pass  # outstanding view() slices; see above
+        finally:
+            self._file.close()
+
+    def _offset(self, i: int) -> int:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("corpus index out of range")
+        return HEADER.size + i * self.record_size
+
+    def __getitem__(self, i: int) -> str:
+        off = self._offset(i)
+        return unpack(self._view[off:off + PACKED])
+
+    def solution(self, i: int) -> Optional[str]:
+        """Stored solution of puzzle i, or None if there is none."""
+        if not self.has_solutions:
+            return None
+        off = self._offset(i) + PACKED
+        packed = self._view[off:off + PACKED]
+        return None if packed == _EMPTY else unpack(packed)
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """
+        Raw records start..stop as one zero-copy memoryview.
+
+        The view holds (stop - start) * record_size bytes of packed records,
+        laid out as in the file; batch.from_records() turns it into digits.
+        Release it when done (or let it go out of scope): the mapping stays
+        in memory while any such view is alive, even after close().
+        """
+        start, stop, _ = slice(start, stop).indices(self._count)
+        stop = max(start, stop)
+        base = HEADER.size
+        return self._view[base + start * self.record_size:base + stop * self.record_size]
+
+    def __iter__(self) -> Iterator[str]:
+        view, size = self._view, self.record_size
+        for off in range(HEADER.size, HEADER.size + self._count * size, size):
+            yield unpack(view[off:off + PACKED])
+
+    def items(self) -> Iterator[Tuple[str, Optional[str]]]:
+        """(puzzle, solution or None) for every record, in order."""
+        for i in range(self._count):
+            yield self[i], self.solution(i)
+
+
+class CorpusWriter:
+    """
+    Append puzzles to a new corpus file.
+
+    The record count in the header is written on close(), so records can
+    be streamed without knowing their number up front.
+    """
+
+    def __init__(self, path: str, *, solutions: bool = False):
+        self.path = path
+        self.solutions = solutions
+        self.count = 0
+        self._record_size = 2 * PACKED if solutions else PACKED
+        self._file: IO[bytes] = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self) -> bytes:
+        flags = HAS_SOLUTIONS if self.solutions else 0
+        return HEADER.pack(MAGIC, VERSION, flags, self._record_size, self.count)
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, puzzle: str, solution: Optional[str] = None):
+        """
+        Add one record.
+
+        Args:
+            puzzle: 81 digits, '0' for blanks
+            solution: 81 digits; stored only if the corpus has solutions
+
+        Raises:
+            ValueError: If puzzle, or a solution to be stored, is not 81
+                ASCII digits
+        """
+        record = pack(puzzle)
+        if self.solutions:
+            record += pack(solution) if solution else _EMPTY
+        self._file.write(record)
+        self.count += 1
+
+    def close(self):
+        """Write the final header and close the file."""
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+
+def parse_line(line: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    (puzzle, solution or None) from one text line.
+
+    Like parse_puzzle, non-digits are dropped; 81 digits are a puzzle and 162
+    a puzzle followed by its solution. Returns None for any other count.
+    """
+    digits = "".join(ch for ch in line if ch.isdigit())
+    if not digits.isascii():
+        return None  # digits of other scripts cannot be packed
+    if len(digits) == 81:
+        return digits, None
+    if len(digits) == 162:
+        return digits[:81], digits[81:]
+    return None
+
+
+def from_text(lines: Iterable[str], path: str, *, solutions: bool = False,
+              bad: Optional[list] = None) -> int:
+    """
+    Pack line-based puzzles into a corpus at path.
+
+    Args:
+        lines: Text lines, see parse_line(); blank lines are skipped
+        path: Corpus file to write
+        solutions: Reserve room for solutions and store those the lines carry
+        bad: If given, collects the numbers of malformed lines (else they
+            raise ValueError)
+
+    Returns:
+        The number of records written
+    """
+    with CorpusWriter(path, solutions=solutions) as out:
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            parsed = parse_line(line)
+            if parsed is None:
+                if bad is None:
+                    raise ValueError(f"line {lineno}: expected 81 or 162 digits")
+                bad.append(lineno)
+                continue
+            out.append(*parsed)
+        return out.count
+
+
+def to_text(corpus: Corpus, out: TextIO, *, chunk: int = 1024) -> int:
+    """
+    Write corpus as text, one puzzle per line followed by its solution
+    when one is stored.
+
+    Returns:
+        The number of lines written
+    """
+    buf = []
+    for puzzle, solution in corpus.items():
+        buf.append(f"{puzzle} {solution}\n" if solution else puzzle + "\n")
+        if len(buf) >= chunk:
+            out.write("".join(buf))
+            buf.clear()
+    out.write("".join(buf))
+    return len(corpus)
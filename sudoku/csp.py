@@ -1,230 +1,1645 @@
-from typing import List, Set, Dict, Tuple, Optional
-import copy
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import combinations, islice
+from math import isqrt
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Optional
 
+from . import dlx
+from .cache import SolutionCache
 
-def solve(grid: List[List[str]], *, use_mrv: bool = False, use_lcv: bool = False, 
-            use_fc: bool = False, use_ac3: bool = False) -> Optional[List[List[str]]]:
+
+# ---------- Board geometry ----------
+# A board has box size k and n = k * k rows, columns, boxes and digits. A
+# domain is an n-bit integer: bit (d - 1) is set while digit d is a
+# candidate. Cells are flat indices r * n + c; units are numbered rows
+# 0..n-1, columns n..2n-1, boxes 2n..3n-1.
+
+# Smallest and largest supported box size (4x4 up to 25x25 boards)
+MIN_BOX, MAX_BOX = 2, 5
+# Boards with at most this many digits (9x9 and 4x4) get mask-indexed
+# lookup tables; larger ones compute the same values per mask, since
+# tabulating 2**16 masks takes longer than most 16x16 searches
+TABLE_DIGITS = 9
+
+
+class _BitCount:
+    """Geometry.popcount-style lookup for masks too wide to tabulate."""
+
+    def __getitem__(self, mask: int) -> int:
+        return mask.bit_count()
+
+
+class _MaskDigits:
+    """Geometry.mask_digits-style lookup for masks too wide to tabulate."""
+
+    def __getitem__(self, mask: int) -> Tuple[int, ...]:
+        digits = []
+        while mask:
+            low = mask & -mask
+            digits.append(low.bit_length())
+            mask ^= low
+        return tuple(digits)
+
+
+class _Spread:
+    """Geometry.spread-style lookup for masks too wide to tabulate."""
+
+    def __init__(self, count_shift: Tuple[int, ...], mask_digits: _MaskDigits):
+        self.count_shift = count_shift
+        self.mask_digits = mask_digits
+
+    def __getitem__(self, mask: int) -> int:
+        shift = self.count_shift
+        return sum(1 << shift[d] for d in self.mask_digits[mask])
+
+
+class Geometry:
+    """
+    Static constraint index and mask tables for one board size.
+
+    Built once per box size by geometry() and shared by every solver
+    instance of that size; the 9x9 one also backs the module-level tables
+    below.
+
+    Attributes:
+        box: Box size k
+        size: Digits, and cells per unit (n = k * k)
+        cells: Cells on the board (n * n)
+        all_digits: Mask with every digit set
+        bit: bit[d] -> mask with only digit d set (index 0 unused)
+        popcount: popcount[mask] -> domain size
+        mask_digits: mask_digits[mask] -> digits in the mask, ascending
+        count_shift, spread: Packed digit counters hold one field of
+            count_bits bits per digit, digit d at bit count_shift[d];
+            spread[mask] adds 1 to the field of every digit in mask, so
+            summing spread over a cell's peers counts every digit at once
+        units: The 3n units as tuples of cells
+        cell_units: cell_units[cell] -> (row unit, column unit, box unit)
+        peers: peers[cell] -> the other cells sharing a unit with cell, ascending
+        intersections: (segment, rest of box, rest of line) for each
+            box/line overlap of k cells, used by box-line reduction
+
+    There is no table of directed arcs: AC-3 here (SudokuCSP.ac3) revises
+    the peers of cells that became singletons, which peers already gives.
+    """
+
+    def __init__(self, box: int):
+        k = box
+        n = k * k
+        self.box, self.size, self.cells = k, n, n * n
+        self.all_digits = (1 << n) - 1
+        self.bit = (0,) + tuple(1 << (d - 1) for d in range(1, n + 1))
+
+        self.units: Tuple[Tuple[int, ...], ...] = (
+            tuple(tuple(r * n + c for c in range(n)) for r in range(n))
+            + tuple(tuple(r * n + c for r in range(n)) for c in range(n))
+            + tuple(tuple((br + r) * n + bc + c for r in range(k) for c in range(k))
+                    for br in range(0, n, k) for bc in range(0, n, k))
+        )
+        self.cell_units: Tuple[Tuple[int, int, int], ...] = tuple(
+            (r, n + c, 2 * n + (r // k) * k + c // k) for r in range(n) for c in range(n)
+        )
+        self.peers: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(sorted({p for u in self.cell_units[cell] for p in self.units[u]} - {cell}))
+            for cell in range(self.cells)
+        )
+        self.intersections: Tuple[Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]], ...] = tuple(
+            (tuple(sorted(set(self.units[b]) & set(self.units[line]))),
+             tuple(sorted(set(self.units[b]) - set(self.units[line]))),
+             tuple(sorted(set(self.units[line]) - set(self.units[b]))))
+            for b in range(2 * n, 3 * n) for line in range(2 * n)
+            if set(self.units[b]) & set(self.units[line])
+        )
+
+        # Fields wide enough to count every peer
+        self.count_bits = len(self.peers[0]).bit_length()
+        self.count_shift = (0,) + tuple(self.count_bits * (d - 1) for d in range(1, n + 1))
+        if n <= TABLE_DIGITS:
+            masks = range(self.all_digits + 1)
+            self.popcount = bytes(bin(m).count('1') for m in masks)
+            self.mask_digits = tuple(tuple(d for d in range(1, n + 1) if m & self.bit[d])
+                                     for m in masks)
+            self.spread = tuple(sum(1 << self.count_shift[d] for d in digits)
+                                for digits in self.mask_digits)
+        else:
+            self.popcount = _BitCount()
+            self.mask_digits = _MaskDigits()
+            self.spread = _Spread(self.count_shift, self.mask_digits)
+
+
+_GEOMETRIES: Dict[int, Geometry] = {}
+
+
+def geometry(box: int) -> Geometry:
+    """
+    The shared Geometry for box size box (MIN_BOX..MAX_BOX).
+
+    Raises:
+        ValueError: If the box size is unsupported
+    """
+    if not MIN_BOX <= box <= MAX_BOX:
+        raise ValueError(f"Unsupported box size: {box} (expected {MIN_BOX}-{MAX_BOX})")
+    if box not in _GEOMETRIES:
+        _GEOMETRIES[box] = Geometry(box)
+    return _GEOMETRIES[box]
+
+
+# ---------- 9x9 tables ----------
+# The standard board, built at import; the generator's mask helpers and the
+# NumPy unit tables of batch read these
+_STANDARD = geometry(3)
+BIT = _STANDARD.bit
+POPCOUNT = _STANDARD.popcount
+MASK_DIGITS = _STANDARD.mask_digits
+UNITS = _STANDARD.units
+CELL_UNITS = _STANDARD.cell_units
+
+
+def solve(grid: List[List[str]], *, use_mrv: bool = False, use_lcv: bool = False,
+            use_fc: bool = False, use_ac3: bool = False,
+            use_mac: bool = False, use_hidden_singles: bool = False,
+            use_naked_subsets: bool = False,
+            use_box_line: bool = False,
+            use_degree: bool = False,
+            use_cbj: bool = False,
+            engine: str = "csp",
+            stats: Optional['SearchStats'] = None,
+            cache: Optional[SolutionCache] = None,
+            budget: Optional['SearchBudget'] = None) -> Optional[List[List[str]]]:
     """
     Solve a Sudoku puzzle using CSP backtracking with optional optimizations.
-    
+
     Args:
-        grid: 9x9 grid where each cell is a string '0'-'9' ('0' means empty)
+        grid: n x n grid (9x9, or any k*k x k*k for k = 2-5) where each cell
+            is a value token '0'-'n' ('0' means empty); see parse_tokens()
         use_mrv: If True, use Minimum Remaining Values heuristic for variable selection
         use_lcv: If True, use Least Constraining Value heuristic for value ordering
         use_fc: If True, use Forward Checking during search
         use_ac3: If True, use AC-3 algorithm for initial constraint propagation
-    
+        use_mac: If True, maintain arc consistency after every assignment
+        use_hidden_singles: If True, place digits that fit only one cell of a unit
+        use_naked_subsets: If True, apply naked pairs and triples
+        use_box_line: If True, apply box-line reduction (pointing/claiming)
+        use_degree: If True, break MRV ties by the most unassigned peers
+        use_cbj: If True, search with conflict-directed backjumping and
+            nogood learning (SudokuCSP.backjump; recursive "csp" engine only)
+        engine: "csp" for the recursive SudokuCSP backtracker, "iterative" for
+            the same search on an explicit stack (SudokuCSP.search), or "dlx"
+            for the exact-cover Dancing Links solver in sudoku.dlx (which
+            ignores the other options but budget; 9x9 only)
+        stats: If given, a SearchStats that the CSP search fills in
+        cache: If given, a SolutionCache consulted first; the search only
+            runs on a miss, on the canonical form of the puzzle (9x9 only)
+        budget: If given, a SearchBudget checked at every search node
+
+    The three unit-level rules run before search and again at every node.
+
     Returns:
-        Solved 9x9 grid as list of lists of strings, or None if no solution exists
-    
+        Solved grid as list of lists of value tokens, or None if no solution exists
+
+    Raises:
+        ValueError: For an unknown engine, an unsupported board size, or a
+            9x9-only feature on another size
+        SearchAborted: If budget ran out or was cancelled
+
     Example:
         >>> grid = [['5','3','0', ...], ...]  # 0 represents empty cells
         >>> solution = solve(grid, use_mrv=True, use_fc=True)
     """
+    if engine not in ("csp", "iterative", "dlx"):
+        raise ValueError(f"Unknown engine: {engine!r}")
+    if use_cbj and engine != "csp":
+        raise ValueError("use_cbj needs the recursive csp engine")
+    if len(grid) != 9 and (engine == "dlx" or cache is not None):
+        raise ValueError("The dlx engine and the solution cache only support 9x9 boards")
+    if cache is not None:
+        opts = dict(use_mrv=use_mrv, use_lcv=use_lcv, use_fc=use_fc, use_ac3=use_ac3,
+                    use_mac=use_mac, use_hidden_singles=use_hidden_singles,
+                    use_naked_subsets=use_naked_subsets, use_box_line=use_box_line,
+                    use_degree=use_degree, use_cbj=use_cbj, engine=engine, stats=stats,
+                    budget=budget)
+        sol = cache.solve(from_grid(grid),
+                          lambda puzzle: solve_string(puzzle, **opts))
+        return None if sol is None else to_grid(sol)
+    if engine == "dlx":
+        return dlx.solve(grid, budget)
+
+    prepared = _prepare(grid, use_mrv=use_mrv, use_fc=use_fc, use_ac3=use_ac3,
+                        use_mac=use_mac, use_hidden_singles=use_hidden_singles,
+                        use_naked_subsets=use_naked_subsets, use_box_line=use_box_line,
+                        use_degree=use_degree, stats=stats, budget=budget)
+    if prepared is None:
+        return None
+    csp, propagators = prepared
+
+    # Solve using backtracking with specified heuristics
+    if use_cbj:
+        search = csp.backjump
+    else:
+        search = csp.search if engine == "iterative" else csp.backtrack
+    if search(use_mrv=use_mrv, use_lcv=use_lcv, use_fc=use_fc, use_mac=use_mac,
+              propagators=propagators):
+        return csp.get_solution()
+    return None  # No solution found
+
+
+# Options count_solutions() starts from: proving uniqueness exhausts the
+# whole search tree, so it pays to prune hard
+COUNT_DEFAULTS: Dict[str, Any] = dict(use_mrv=True, use_mac=True, use_hidden_singles=True)
+
+
+def count_solutions(grid: List[List[str]], limit: int = 2, **opts: Any) -> int:
+    """
+    Count the solutions of a puzzle, stopping as soon as limit are found.
+
+    The search is the one solve() runs, with the same pruning, except that
+    it keeps backtracking past each solution until limit is reached or the
+    tree is exhausted.
+
+    Args:
+        grid: n x n grid of value tokens ('0' means empty), as for solve()
+        limit: Stop counting at this many solutions
+        **opts: Keyword options for solve(), on top of COUNT_DEFAULTS;
+            use_lcv and use_cbj are ignored and engine "iterative" counts
+            like "csp"
+
+    Returns:
+        The number of solutions, capped at limit
+
+    Example:
+        >>> count_solutions(grid)  # 0: unsolvable, 1: unique, 2: ambiguous
+    """
+    opts = {**COUNT_DEFAULTS, **opts}
+    engine = opts.pop("engine", "csp")
+    opts.pop("use_lcv", None)
+    opts.pop("use_cbj", None)
+    if limit <= 0:
+        return 0
+    if engine == "dlx":
+        if len(grid) != 9:
+            raise ValueError("The dlx engine only supports 9x9 boards")
+        return dlx.count_solutions(grid, limit, opts.get("budget"))
+    if engine not in ("csp", "iterative"):
+        raise ValueError(f"Unknown engine: {engine!r}")
+
+    prepared = _prepare(grid, **opts)
+    if prepared is None:
+        return 0
+    csp, propagators = prepared
+    return csp.count(limit, use_mrv=opts.get("use_mrv", False), use_fc=opts.get("use_fc", False),
+                     use_mac=opts.get("use_mac", False), propagators=propagators)
+
+
+def unique(grid: List[List[str]], **opts: Any) -> bool:
+    """
+    True if the puzzle has exactly one solution.
+
+    Args:
+        grid: n x n grid of value tokens ('0' means empty), as for solve()
+        **opts: Keyword options for count_solutions()
+    """
+    return count_solutions(grid, 2, **opts) == 1
+
+
+def _prepare(grid: List[List[str]], *, use_mrv: bool = False, use_fc: bool = False,
+             use_ac3: bool = False, use_mac: bool = False,
+             use_hidden_singles: bool = False, use_naked_subsets: bool = False,
+             use_box_line: bool = False, use_degree: bool = False,
+             stats: Optional['SearchStats'] = None,
+             budget: Optional['SearchBudget'] = None
+             ) -> Optional[Tuple['SudokuCSP', List[Callable[['SudokuCSP'], bool]]]]:
+    """
+    Build the SudokuCSP for grid and run the pre-search inference of solve().
+
+    Returns:
+        (csp, propagators) ready for search, or None if the givens or the
+        initial propagation already rule out every solution
+    """
     # Initialize the CSP
     csp = SudokuCSP(grid)
-    
+    if stats is not None:
+        csp.attach_stats(stats)
+    if budget is not None:
+        csp.attach_budget(budget)
+
+    # Clashing givens leave an empty domain behind
+    if not all(csp.domains):
+        return None
+
+    # With inference keeping domains current, MRV can read domain sizes
+    # straight from buckets instead of scanning all 81 cells
+    inference = use_fc or use_mac or use_hidden_singles or use_naked_subsets or use_box_line
+    if use_mrv and inference:
+        csp.enable_mrv_buckets(degree_tiebreak=use_degree)
+    else:
+        csp.degree_tiebreak = use_degree
+
     # Apply AC-3 if requested for initial constraint propagation
     if use_ac3:
         if not csp.ac3():
-            return None  # No solution exists
-        
-    # Solve using backtracking with specified heuristics
-    if csp.backtrack(use_mrv=use_mrv, use_lcv=use_lcv, use_fc=use_fc):
-        return csp.get_solution()
-    return None  # No solution found
+            return None
+
+    # Unit-level propagation rules, in order of cost
+    propagators = []
+    if use_hidden_singles:
+        propagators.append(SudokuCSP.hidden_singles)
+    if use_naked_subsets:
+        propagators.append(SudokuCSP.naked_subsets)
+    if use_box_line:
+        propagators.append(SudokuCSP.box_line_reduction)
+    if propagators:
+        if not csp.ac3() or not csp.propagate(propagators):
+            return None
+    return csp, propagators
+
+
+def parse_puzzle(text: str) -> Optional[str]:
+    """
+    Normalize puzzle text: drop every non-digit and require exactly 81 digits.
+
+    This is the rule of the command line; parse_tokens(), used by the GUI
+    import, accepts every text this one does and reads it the same way.
+
+    Args:
+        text: Free-form puzzle text ('0' for blanks)
+
+    Returns:
+        The 81-digit puzzle string, or None if the digit count is wrong
+    """
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return digits if len(digits) == 81 else None
+
+
+def parse_tokens(text: str) -> Optional[List[List[str]]]:
+    """
+    Parse a puzzle of any supported size in the token format.
+
+    Values are whitespace- or comma-separated integers, row by row, with '0'
+    or '.' for blanks, so values above 9 fit ("16" is one cell). The number
+    of tokens fixes the size: n * n cells for n = k * k, k = 2-5.
+
+    Text with exactly 81 digits is always the 9x9 puzzle parse_puzzle()
+    reads, whatever else it holds (borders such as '|', '-' and '+' are
+    dropped). Text that is neither is read one character per cell, every
+    digit or '.' being a cell, which covers dotted puzzles and compact 4x4
+    boards.
+
+    Args:
+        text: Puzzle text
+
+    Returns:
+        n x n grid of value tokens ('0' for blanks), or None if the text is
+        not a supported board or a value is out of range
+    """
+    def board_size(cells: int) -> Optional[int]:
+        n = isqrt(cells)
+        box = isqrt(n)
+        if n * n == cells and box * box == n and MIN_BOX <= box <= MAX_BOX:
+            return n
+        return None
+
+    puzzle = parse_puzzle(text)
+    if puzzle is not None:
+        # No other board size has exactly 81 digits in the token format
+        tokens, n = list(puzzle), 9
+    else:
+        tokens = text.replace(",", " ").split()
+        n = board_size(len(tokens))
+        if n is None or not all(token.isdigit() or token == "." for token in tokens):
+            tokens = [ch for ch in text if ch.isdigit() or ch == "."]
+            n = board_size(len(tokens))
+            if n is None:
+                return None
+    values = []
+    for token in tokens:
+        if token == ".":
+            token = "0"
+        if not token.isdigit() or int(token) > n:
+            return None
+        values.append(str(int(token)))
+    return [values[r * n:r * n + n] for r in range(n)]
+
+
+def format_tokens(grid: List[List[str]]) -> str:
+    """
+    Inverse of parse_tokens(): one line per row, values space-separated and
+    right-aligned to the widest value.
+    """
+    width = len(str(len(grid)))
+    return "\n".join(" ".join(v.rjust(width) for v in row) for row in grid)
+
+
+def to_grid(puzzle: str) -> List[List[str]]:
+    """9x9 grid of one-character strings from 81 digits, row by row."""
+    return [list(puzzle[r * 9:r * 9 + 9]) for r in range(9)]
+
+
+def from_grid(grid: List[List[str]]) -> str:
+    """Inverse of to_grid(): the 9x9 grid as 81 digits, row by row."""
+    return "".join("".join(row) for row in grid)
+
+
+def solve_string(puzzle: str, **opts: Any) -> Optional[str]:
+    """
+    Solve a puzzle given in the 81-character PUZZLES format.
+
+    Args:
+        puzzle: 81 digits, row by row, '0' for blanks
+        **opts: Keyword options for solve()
+
+    Returns:
+        The solution as 81 digits, or None if no solution exists
+    """
+    sol = solve(to_grid(puzzle), **opts)
+    return None if sol is None else from_grid(sol)
+
+
+def imap_chunks(task: Callable[..., List[Any]], items: Iterable[Any], *, workers: int,
+                chunksize: int, args: Tuple[Any, ...] = (),
+                initializer: Optional[Callable[..., None]] = None,
+                initargs: Tuple[Any, ...] = ()) -> Iterator[Any]:
+    """
+    Lazily run task(chunk, *args) over consecutive chunks of items.
+
+    With more than one worker the chunks go to a process pool and at most
+    4 * workers of them are in flight, so arbitrarily long streams run in
+    bounded memory; task, args and initializer must then be picklable.
+
+    Args:
+        task: Called with a list of up to chunksize items and args; returns
+            one result per item
+        items: Input stream
+        workers: Number of worker processes; 1 or fewer runs in this process
+        chunksize: Items per task
+        args: Extra arguments for task, sent with every chunk
+        initializer: Called with initargs once in each worker process
+
+    Yields:
+        The results of task, flattened, in input order
+    """
+    source = iter(items)
+    chunks = iter(lambda: list(islice(source, chunksize)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from task(chunk, *args)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(task, chunk, *args))
+            if len(pending) >= 4 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _solve_timed(puzzles: List[str], opts: Dict[str, Any]) -> List[Tuple[Optional[str], float]]:
+    """Solve a chunk of puzzles, timing each one."""
+    results = []
+    for puzzle in puzzles:
+        t0 = time.perf_counter()
+        sol = solve_string(puzzle, **opts)
+        results.append((sol, time.perf_counter() - t0))
+    return results
+
+
+# Options installed once per pool worker by _init_worker
+_worker_opts: Dict[str, Any] = {}
+
+
+def _init_worker(opts: Dict[str, Any]):
+    """Pool initializer: keep the solve() options in the worker process."""
+    _worker_opts.clear()
+    _worker_opts.update(opts)
+
+
+def _solve_in_worker(puzzles: List[str]) -> List[Tuple[Optional[str], float]]:
+    """Solve one chunk inside a pool worker with the installed options."""
+    return _solve_timed(puzzles, _worker_opts)
+
+
+def iter_solve(puzzles: Iterable[str], *, workers: Optional[int] = None,
+               chunksize: int = 64, **opts: Any) -> Iterator[Tuple[Optional[str], float]]:
+    """
+    Lazily solve a stream of puzzles, optionally across a process pool.
+
+    Input is consumed chunk by chunk and at most a few chunks per worker are
+    in flight, so arbitrarily long streams run in bounded memory. Puzzles
+    travel to the workers as plain 81-character strings; the solve() options
+    are sent once per worker, not per puzzle. A SolutionCache passed as
+    cache= is copied into each worker, which then fills its own copy.
+
+    Args:
+        puzzles: 81-character puzzle strings ('0' for blanks)
+        workers: Number of worker processes (default: os.cpu_count()); 1 or
+            fewer solves in this process
+        chunksize: Puzzles sent to a worker per task
+        **opts: Keyword options for solve()
+
+    Yields:
+        (solution or None, seconds spent solving) per puzzle, in input order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        yield from imap_chunks(_solve_timed, puzzles, workers=1, chunksize=chunksize,
+                               args=(opts,))
+    else:
+        yield from imap_chunks(_solve_in_worker, puzzles, workers=workers,
+                               chunksize=chunksize, initializer=_init_worker,
+                               initargs=(opts,))
+
+
+def solve_many(puzzles: Iterable[str], *, workers: Optional[int] = None,
+               chunksize: int = 64, **opts: Any) -> List[Optional[str]]:
+    """
+    Solve many puzzles across a process pool.
+
+    Args:
+        puzzles: 81-character puzzle strings ('0' for blanks)
+        workers: Number of worker processes (default: os.cpu_count()); 1 or
+            fewer solves in this process
+        chunksize: Puzzles sent to a worker per task
+        **opts: Keyword options for solve()
+
+    Returns:
+        Solutions as 81-character strings (None where unsolvable), in input order
+    """
+    return [sol for sol, _ in iter_solve(puzzles, workers=workers, chunksize=chunksize, **opts)]
+
+
+class SearchAborted(Exception):
+    """Raised out of a search whose SearchBudget ran out or was cancelled."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class SearchBudget:
+    """
+    Cooperative limits for a search, checked once per search node.
+
+    The budget may be cancelled from another thread (e.g. a GUI) while the
+    search runs; the search then raises SearchAborted at its next node.
+
+    Attributes:
+        max_seconds: Wall-clock limit from start(), None for no limit
+        max_nodes: Node limit, None for no limit
+        nodes: Nodes charged since start()
+        cancelled: Set by cancel()
+    """
+
+    # The clock is read once per this many nodes
+    CHECK_EVERY = 64
+
+    def __init__(self, max_seconds: Optional[float] = None, max_nodes: Optional[int] = None):
+        self.max_seconds = max_seconds
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.cancelled = False
+        self.started = time.perf_counter()
+
+    def start(self):
+        """Restart the clock and the node count."""
+        self.nodes = 0
+        self.started = time.perf_counter()
+
+    def cancel(self):
+        """Ask the search to stop at its next node."""
+        self.cancelled = True
+
+    def elapsed(self) -> float:
+        """Seconds since start()."""
+        return time.perf_counter() - self.started
+
+    def charge(self):
+        """
+        Account for one search node.
+
+        Raises:
+            SearchAborted: If cancelled or a limit is exceeded
+        """
+        self.nodes += 1
+        if self.cancelled:
+            raise SearchAborted("cancelled")
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise SearchAborted(f"node budget of {self.max_nodes} exhausted")
+        if (self.max_seconds is not None and not self.nodes % self.CHECK_EVERY
+                and self.elapsed() > self.max_seconds):
+            raise SearchAborted(f"time budget of {self.max_seconds:g} s exhausted")
+
+
+class SearchStats:
+    """
+    Search counters for one or more solves.
+
+    Attributes:
+        nodes: Calls to backtrack(), i.e. variables selected
+        backtracks: Assignments retracted after failing
+        wipeouts: Forward checks or AC-3 runs that emptied a domain
+        pruned_fc: Values removed by forward checking
+        pruned_ac3: Values removed by AC-3 (preprocessing, MAC and propagation)
+        max_depth: Deepest stack of search assignments
+        backjumps: Levels skipped by backjump() beyond chronological backtracking
+        phase_time: Seconds spent in each of PHASES
+    """
+
+    PHASES = ("ac3", "select_unassigned_variable", "order_domain_values", "forward_check")
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.wipeouts = 0
+        self.pruned_fc = 0
+        self.pruned_ac3 = 0
+        self.max_depth = 0
+        self.backjumps = 0
+        self.depth = 0  # current search depth
+        self.phase_time: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+
+    def summary(self) -> str:
+        """One-line human readable digest, e.g. for a status bar."""
+        text = (f"{self.nodes} nodes, {self.backtracks} backtracks, {self.wipeouts} wipeouts, "
+                f"pruned FC {self.pruned_fc} / AC-3 {self.pruned_ac3}, depth {self.max_depth}")
+        if self.backjumps:
+            text += f", {self.backjumps} levels backjumped"
+        return text
+
+
+# backjump() learns nogoods of at most NOGOOD_SIZE assignments and keeps
+# the NOGOOD_CACHE most recently used
+NOGOOD_SIZE = 3
+NOGOOD_CACHE = 4096
+
+
+class NogoodCache:
+    """
+    Bounded LRU of nogoods: sets of (cell, value) assignments that cannot
+    all hold in any solution of the puzzle.
+
+    Nogoods are only valid for the givens they were learned under, so a
+    cache belongs to one search and must not be reused across puzzles.
+
+    Each nogood is indexed by its assignments, so checking one new
+    assignment only looks at the nogoods that mention it.
+
+    Attributes:
+        maxsize: Nogoods kept; the least recently used is evicted past this
+        max_literals: Longer nogoods are not stored
+        hits: Assignments rejected by a stored nogood
+        evictions: Nogoods dropped to stay within maxsize
+    """
+
+    def __init__(self, maxsize: int = NOGOOD_CACHE, max_literals: int = NOGOOD_SIZE):
+        self.maxsize = maxsize
+        self.max_literals = max_literals
+        self.hits = 0
+        self.evictions = 0
+        self._nogoods: "OrderedDict[Tuple[Tuple[int, int], ...], None]" = OrderedDict()
+        self._index: Dict[Tuple[int, int], Set[Tuple[Tuple[int, int], ...]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nogoods)
+
+    def add(self, literals: Sequence[Tuple[int, int]]):
+        """Store the nogood literals unless it is too long or known."""
+        if not literals or len(literals) > self.max_literals:
+            return
+        key = tuple(sorted(literals))
+        if key in self._nogoods:
+            self._nogoods.move_to_end(key)
+            return
+        self._nogoods[key] = None
+        index = self._index
+        for lit in key:
+            index.setdefault(lit, set()).add(key)
+        if len(self._nogoods) > self.maxsize:
+            old, _ = self._nogoods.popitem(last=False)
+            for lit in old:
+                index[lit].discard(old)
+            self.evictions += 1
+
+    def violated(self, cell: int, value: int, values: List[int]) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """
+        A stored nogood that assigning value to cell would complete.
+
+        Args:
+            cell: Cell about to be assigned
+            value: Value about to be assigned
+            values: Current assignment, values[cell] (0 while unassigned)
+
+        Returns:
+            The nogood, or None if every stored one still has an
+            assignment missing
+        """
+        for key in self._index.get((cell, value), ()):
+            for c, v in key:
+                if c != cell and values[c] != v:
+                    break
+            else:
+                self._nogoods.move_to_end(key)
+                self.hits += 1
+                return key
+        return None
 
 
 class SudokuCSP:
     """
     Represents a Sudoku puzzle as a Constraint Satisfaction Problem.
-    
-    Variables: Each empty cell (r, c) in the 9x9 grid
-    Domain: Numbers 1-9 for each variable
-    Constraints: Sudoku rules (row, column, and 3x3 box uniqueness)
+
+    Variables: Each empty cell (r, c) in the n x n grid (n = k * k, 9 by default)
+    Domain: Numbers 1-n for each variable
+    Constraints: Sudoku rules (row, column, and k x k box uniqueness)
+
+    Cells are addressed by flat index ``cell = r * n + c`` and each domain is
+    an n-bit mask (see ``Geometry``: ``bit`` / ``popcount`` / ``mask_digits``).
     """
-    
+
     def __init__(self, grid: List[List[str]]):
         """
         Initialize the CSP from a Sudoku grid.
-        
+
         Args:
-            grid: 9x9 grid where '0' represents an empty cell
+            grid: n x n grid of value tokens ('0' for an empty cell, '1'-'n'
+                otherwise) with n = k * k for a box size k of 2-5
+
+        Raises:
+            ValueError: If the grid is not a supported square board
         """
-        self.size = 9
+        n = len(grid)
+        box = isqrt(n)
+        if box * box != n or any(len(row) != n for row in grid):
+            raise ValueError(f"Grid must be n x n with n a square, got {n} rows")
+        self.geometry = g = geometry(box)
+        self.size = n
         self.grid = [row[:] for row in grid]  # Deep copy
-        
+
+        # values[cell] is the digit assigned to cell, 0 while unassigned;
+        # unit_used[u] is the mask of digits placed in unit u
+        self.values: List[int] = [0] * g.cells
+        self.unit_used: List[int] = [0] * len(g.units)
+
         # Initialize domains for each cell
-        # domains[r][c] is a set of possible values for cell (r, c)
-        self.domains: List[List[Set[int]]] = [[set() for _ in range(9)] for _ in range(9)]
-        
-        for r in range(9):
-            for c in range(9):
+        # domains[cell] is a bitmask of possible values for that cell
+        self.domains: List[int] = [0] * g.cells
+
+        # Undo log of domain changes: flat (cell, old_mask) pairs. A level
+        # marker is just len(trail); undo_to(marker) truncates back to it.
+        self.trail: List[int] = []
+
+        # MRV buckets (see enable_mrv_buckets): buckets[k] holds the
+        # unassigned cells whose domain has k values; None while disabled
+        self.buckets: Optional[List[Set[int]]] = None
+        self.degree_tiebreak = False
+
+        for r in range(n):
+            for c in range(n):
+                if grid[r][c] != '0':
+                    # Given cell: domain is the single given value, or empty
+                    # if it clashes with an earlier given or is out of range
+                    cell = r * n + c
+                    value = int(grid[r][c])
+                    bit = g.bit[value] if 0 < value <= n else 0
+                    self.domains[cell] = bit & self._get_legal_values(r, c)
+                    if bit:
+                        self._assign(cell, value)
+        for r in range(n):
+            for c in range(n):
                 if grid[r][c] == '0':
                     # Empty cell: calculate possible values
-                    self.domains[r][c] = self._get_legal_values(r, c)
-                else:
-                    # Given cell: domain is the single given value
-                    self.domains[r][c] = {int(grid[r][c])}
-                    
-    def _get_legal_values(self, row: int, col: int) -> Set[int]:
+                    self.domains[r * n + c] = self._get_legal_values(r, c)
+
+    def attach_stats(self, stats: SearchStats):
+        """
+        Count and time search events into stats.
+
+        The instrumenting wrappers are installed on this instance only, so an
+        un-instrumented solver runs exactly the plain methods at no cost.
+
+        Args:
+            stats: Counters to add to
+        """
+        stats.depth = 0
+        clock = time.perf_counter
+        phase_time, trail = stats.phase_time, self.trail
+        select, order = self.select_unassigned_variable, self.order_domain_values
+        check, ac3 = self.forward_check, self.ac3
+        assign, unassign, restore = self._assign, self._unassign, self.restore_domains
+
+        def select_unassigned_variable(use_mrv):
+            stats.nodes += 1
+            t0 = clock()
+            cell = select(use_mrv)
+            phase_time["select_unassigned_variable"] += clock() - t0
+            return cell
+
+        def order_domain_values(cell, use_lcv):
+            t0 = clock()
+            values = order(cell, use_lcv)
+            phase_time["order_domain_values"] += clock() - t0
+            return values
+
+        def forward_check(cell, value):
+            t0, before = clock(), len(trail)
+            ok = check(cell, value)
+            phase_time["forward_check"] += clock() - t0
+            stats.pruned_fc += (len(trail) - before) // 2
+            stats.wipeouts += not ok
+            return ok
+
+        def instrumented_ac3(queue=None):
+            t0, before = clock(), len(trail)
+            ok = ac3(queue)
+            phase_time["ac3"] += clock() - t0
+            stats.pruned_ac3 += (len(trail) - before) // 2
+            stats.wipeouts += not ok
+            return ok
+
+        def _assign(cell, value):
+            stats.depth += 1
+            if stats.depth > stats.max_depth:
+                stats.max_depth = stats.depth
+            assign(cell, value)
+
+        def _unassign(cell, value):
+            stats.depth -= 1
+            unassign(cell, value)
+
+        def restore_domains(marker):
+            stats.backtracks += 1
+            restore(marker)
+
+        def _backjumped(levels):
+            stats.backjumps += levels
+
+        self.select_unassigned_variable = select_unassigned_variable
+        self.order_domain_values = order_domain_values
+        self.forward_check = forward_check
+        self.ac3 = instrumented_ac3
+        self._assign = _assign
+        self._unassign = _unassign
+        self.restore_domains = restore_domains
+        self._backjumped = _backjumped
+
+    def attach_budget(self, budget: SearchBudget):
+        """
+        Charge every search node to budget, which may abort the search.
+
+        Like attach_stats(), this wraps select_unassigned_variable() on this
+        instance only; budget.start() is called here.
+
+        Args:
+            budget: Limits to enforce
+        """
+        budget.start()
+        select = self.select_unassigned_variable
+
+        def select_unassigned_variable(use_mrv):
+            budget.charge()
+            return select(use_mrv)
+
+        self.select_unassigned_variable = select_unassigned_variable
+
+    def _get_legal_values(self, row: int, col: int) -> int:
         """
         Get all legal values for a cell based on current assignments.
-        
+
         Args:
-            row: Row index (0-8)
-            col: Column index (0-8)
-            
+            row: Row index (0 to n-1)
+            col: Column index (0 to n-1)
+
         Returns:
-            Set of integers 1-9 that don't violate Sudoku constraints
+            Bitmask of the digits 1-n that don't violate Sudoku constraints
         """
-        # TODO
-        raise NotImplementedError()
-    
+        g = self.geometry
+        a, b, c = g.cell_units[row * self.size + col]
+        used = self.unit_used
+        return g.all_digits & ~(used[a] | used[b] | used[c])
+
     def get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
         """
         Get all cells that are constrained with the given cell.
-        
-        Neighbors are cells in the same row, column, or 3x3 box.
-        
+
+        Neighbors are cells in the same row, column, or box.
+
         Args:
-            row: Row index (0-8)
-            col: Column index (0-8)
-            
+            row: Row index (0 to n-1)
+            col: Column index (0 to n-1)
+
         Returns:
             List of (row, col) tuples representing neighbor cells
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def select_unassigned_variable(self, use_mrv: bool) -> Optional[Tuple[int, int]]:
+        n = self.size
+        return [divmod(p, n) for p in self.geometry.peers[row * n + col]]
+
+    def _assign(self, cell: int, value: int):
+        """Place value in cell and mark it used in the cell's row, column and box."""
+        g = self.geometry
+        bit = g.bit[value]
+        used = self.unit_used
+        self.values[cell] = value
+        for u in g.cell_units[cell]:
+            used[u] |= bit
+        if self.buckets is not None:
+            self.buckets[g.popcount[self.domains[cell]]].discard(cell)
+
+    def _unassign(self, cell: int, value: int):
+        """Undo _assign(cell, value)."""
+        g = self.geometry
+        bit = g.bit[value]
+        used = self.unit_used
+        self.values[cell] = 0
+        for u in g.cell_units[cell]:
+            used[u] &= ~bit
+        if self.buckets is not None:
+            self.buckets[g.popcount[self.domains[cell]]].add(cell)
+
+    def enable_mrv_buckets(self, degree_tiebreak: bool = False):
+        """
+        Keep unassigned cells bucketed by domain size for O(1) MRV selection.
+
+        set_domain(), undo_to(), _assign() and _unassign() then move a cell
+        between buckets in O(1) per change. Bucket sizes are plain domain
+        sizes, so this is only sound while inference (forward checking, MAC
+        or propagation) removes assigned values from peer domains.
+
+        Args:
+            degree_tiebreak: Among the smallest domains prefer the cell with
+                the most unassigned peers
+        """
+        g = self.geometry
+        self.buckets = [set() for _ in range(g.size + 1)]
+        for cell in range(g.cells):
+            if not self.values[cell]:
+                self.buckets[g.popcount[self.domains[cell]]].add(cell)
+        self.degree_tiebreak = degree_tiebreak
+
+    def _degree(self, cell: int) -> int:
+        """Number of unassigned peers of cell."""
+        values = self.values
+        return sum(1 for p in self.geometry.peers[cell] if not values[p])
+
+    def select_unassigned_variable(self, use_mrv: bool) -> Optional[int]:
         """
         Select the next variable (empty cell) to assign.
-        
+
         Args:
             use_mrv: If True, use Minimum Remaining Values heuristic
                     (select variable with fewest legal values)
                     If False, select first unassigned variable
-        
+
         Returns:
-            (row, col) tuple of selected cell, or None if all assigned
+            Flat index of the selected cell, or None if all assigned
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def order_domain_values(self, row: int, col: int, use_lcv: bool) -> List[int]:
+        values, g = self.values, self.geometry
+        if not use_mrv:
+            for cell in range(g.cells):
+                if not values[cell]:
+                    return cell
+            return None
+
+        if self.buckets is not None:
+            for bucket in self.buckets:
+                if bucket:
+                    if self.degree_tiebreak and len(bucket) > 1:
+                        return max(bucket, key=self._degree)
+                    return next(iter(bucket))
+            return None
+
+        domains, used = self.domains, self.unit_used
+        cell_units, popcount = g.cell_units, g.popcount
+        best, best_size, best_degree = None, g.size + 1, -1
+        for cell in range(g.cells):
+            if values[cell]:
+                continue
+            a, b, c = cell_units[cell]
+            legal = domains[cell] & ~(used[a] | used[b] | used[c])
+            size = popcount[legal]
+            if size < best_size:
+                best, best_size, best_degree = cell, size, -1
+                if size <= 1:
+                    break  # Forced or dead: cannot do better
+            elif size == best_size and self.degree_tiebreak:
+                if best_degree < 0:
+                    best_degree = self._degree(best)
+                degree = self._degree(cell)
+                if degree > best_degree:
+                    best, best_degree = cell, degree
+        return best
+
+    def order_domain_values(self, cell: int, use_lcv: bool) -> List[int]:
         """
         Order the values in the domain of a variable.
-        
+
         Args:
-            row: Row index of the variable
-            col: Column index of the variable
+            cell: Flat index of the variable
             use_lcv: If True, use Least Constraining Value heuristic
                     (order values by how much they constrain neighbors)
                     If False, use arbitrary ordering
-        
+
         Returns:
             List of values from the domain, ordered appropriately
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def is_consistent(self, row: int, col: int, value: int) -> bool:
+        g = self.geometry
+        candidates = g.mask_digits[self.domains[cell]]
+        if not use_lcv or len(candidates) < 2:
+            return list(candidates)
+
+        # Count, for all digits at once, the unassigned peers that still
+        # have each digit (the fields are wide enough for every peer), then
+        # order by fewest eliminations first
+        domains, values, spread = self.domains, self.values, g.spread
+        counts = 0
+        for p in g.peers[cell]:
+            if not values[p]:
+                counts += spread[domains[p]]
+        shift, field = g.count_shift, (1 << g.count_bits) - 1
+        return sorted(candidates, key=lambda d: (counts >> shift[d]) & field)
+
+    def is_consistent(self, cell: int, value: int) -> bool:
         """
         Check if assigning a value to a cell is consistent with constraints.
-        
+
         Args:
-            row: Row index
-            col: Column index
-            value: Value to assign (1-9)
-        
+            cell: Flat index of the cell
+            value: Value to assign (1-n)
+
         Returns:
             True if assignment doesn't violate any constraints
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def forward_check(self, row: int, col: int, value: int) -> Optional[Dict]:
+        g = self.geometry
+        a, b, c = g.cell_units[cell]
+        used = self.unit_used
+        return not (used[a] | used[b] | used[c]) & g.bit[value]
+
+    def set_domain(self, cell: int, mask: int):
+        """
+        Narrow the domain of cell to mask, recording the old domain on the trail.
+
+        Args:
+            cell: Flat index of the cell
+            mask: New domain bitmask
+        """
+        trail, domains, buckets = self.trail, self.domains, self.buckets
+        old = domains[cell]
+        trail.append(cell)
+        trail.append(old)
+        domains[cell] = mask
+        if buckets is not None and not self.values[cell]:
+            popcount = self.geometry.popcount
+            buckets[popcount[old]].discard(cell)
+            buckets[popcount[mask]].add(cell)
+
+    def undo_to(self, marker: int):
+        """
+        Restore every domain changed since marker was taken (marker = len(trail)).
+
+        Args:
+            marker: Trail length to truncate back to
+        """
+        trail, domains, buckets, values = self.trail, self.domains, self.buckets, self.values
+        popcount = self.geometry.popcount
+        while len(trail) > marker:
+            old = trail.pop()
+            cell = trail.pop()
+            if buckets is not None and not values[cell]:
+                buckets[popcount[domains[cell]]].discard(cell)
+                buckets[popcount[old]].add(cell)
+            domains[cell] = old
+
+    def forward_check(self, cell: int, value: int) -> bool:
         """
         Perform forward checking after assigning a value to a cell.
-        
+
         Forward checking removes the assigned value from domains of all neighbors.
         If any neighbor's domain becomes empty, the assignment is invalid.
-        
+        Removals are recorded on the trail; the caller undoes them with
+        restore_domains() whether or not the check succeeds.
+
         Args:
-            row: Row index of assigned variable
-            col: Column index of assigned variable
+            cell: Flat index of the assigned variable
             value: Assigned value
-        
+
         Returns:
-            Dictionary mapping (r,c) -> removed_values for rollback,
-            or None if forward checking detects inconsistency
+            True if every unassigned neighbor keeps a non-empty domain
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def restore_domains(self, removed: Dict[Tuple[int, int], Set[int]]):
+        g = self.geometry
+        bit = g.bit[value]
+        domains, values = self.domains, self.values
+        for p in g.peers[cell]:
+            if not values[p] and domains[p] & bit:
+                self.set_domain(p, domains[p] ^ bit)
+                if not domains[p]:
+                    return False
+        return True
+
+    def restore_domains(self, marker: int):
         """
         Restore domains after backtracking (undo forward checking).
-        
+
         Args:
-            removed: Dictionary from forward_check() mapping cells to removed values
+            marker: Trail length taken before the assignment being undone
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def ac3(self) -> bool:
+        self.undo_to(marker)
+
+    def ac3(self, queue: Optional[List[int]] = None) -> bool:
         """
         Apply AC-3 (Arc Consistency 3) algorithm for constraint propagation.
-        
+
         AC-3 enforces arc consistency by iteratively removing values from domains
         that cannot be part of any solution. This is more powerful than forward
         checking as it propagates constraints through the entire network.
-        
+        Removals go through the trail, so they can be undone during search.
+
+        Every Sudoku constraint is Xi != Xj, so an arc (Xi, Xj) can only prune
+        Xi when Xj's domain is a singleton (see _revise). Instead of queueing
+        arcs, this queues cells whose domain has become a singleton and revises
+        all arcs into each of them once; work is linear in singleton events.
+
+        Args:
+            queue: Singleton cells to propagate from; defaults to every
+                current singleton. MAC passes only the cell just assigned.
+
         Returns:
             True if the CSP is arc-consistent (may have solution),
             False if inconsistency detected (no solution possible)
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def _revise(self, xi: Tuple[int, int], xj: Tuple[int, int]) -> bool:
+        domains, set_domain = self.domains, self.set_domain
+        peers, popcount = self.geometry.peers, self.geometry.popcount
+        if queue is None:
+            queue = [cell for cell in range(len(domains)) if popcount[domains[cell]] == 1]
+        while queue:
+            xj = queue.pop()
+            dj = domains[xj]
+            # _revise(xi, xj) for every peer, inlined
+            for xi in peers[xj]:
+                di = domains[xi]
+                if di & dj:
+                    di ^= dj
+                    set_domain(xi, di)
+                    if not di:
+                        return False
+                    if popcount[di] == 1:
+                        queue.append(xi)
+        return True
+
+    def _revise(self, xi: int, xj: int) -> bool:
         """
         Revise the domain of Xi to make it consistent with Xj.
-        
+
         Remove values from Xi's domain that have no consistent value in Xj's domain.
-        
+        Under Xi != Xj a value d in Xi lacks support only when Xj's domain is
+        exactly {d}, so at most one value is removed.
+
         Args:
-            xi: (row, col) of first variable
-            xj: (row, col) of second variable
-        
+            xi: Flat index of the first variable
+            xj: Flat index of the second variable
+
         Returns:
             True if Xi's domain was revised (values removed), False otherwise
         """
-        # TODO
-        raise NotImplementedError()
-    
-    def backtrack(self, use_mrv: bool = False, use_lcv: bool = False, 
-                    use_fc: bool = False) -> bool:
+        dj = self.domains[xj]
+        if self.geometry.popcount[dj] != 1 or not self.domains[xi] & dj:
+            return False
+        self.set_domain(xi, self.domains[xi] & ~dj)
+        return True
+
+    def maintain_arc_consistency(self, cell: int, value: int) -> bool:
+        """
+        Re-establish arc consistency after assigning value to cell (MAC).
+
+        The cell's domain is narrowed to the assigned value and AC-3 is seeded
+        only with that cell, i.e. the arcs from its peers into it; further
+        cells are queued as they become singletons. All pruning is recorded
+        on the trail.
+
+        Args:
+            cell: Flat index of the assigned variable
+            value: Assigned value
+
+        Returns:
+            True if the network is still arc-consistent
+        """
+        bit = self.geometry.bit[value]
+        if self.domains[cell] != bit:
+            self.set_domain(cell, bit)
+        return self.ac3([cell])
+
+    # ---------- Unit-level propagation ----------
+    # A propagator is any callable taking the SudokuCSP and returning False on
+    # contradiction. It must narrow domains only through set_domain()/narrow()
+    # and expects every assigned cell's domain to be its value (as after
+    # maintain_arc_consistency).
+
+    def narrow(self, cell: int, mask: int) -> bool:
+        """
+        Narrow the domain of cell to mask and propagate a resulting singleton.
+
+        Args:
+            cell: Flat index of the cell
+            mask: New domain bitmask (a subset of the current domain)
+
+        Returns:
+            False if the domain wiped out or singleton propagation failed
+        """
+        self.set_domain(cell, mask)
+        if not mask:
+            return False
+        return self.geometry.popcount[mask] != 1 or self.ac3([cell])
+
+    def propagate(self, propagators: Sequence[Callable[['SudokuCSP'], bool]]) -> bool:
+        """
+        Run propagators in turn until none of them changes a domain.
+
+        Args:
+            propagators: Propagation rules, e.g. SudokuCSP.hidden_singles
+
+        Returns:
+            False if any propagator detected a contradiction
+        """
+        while True:
+            marker = len(self.trail)
+            for propagator in propagators:
+                if not propagator(self):
+                    return False
+            if len(self.trail) == marker:
+                return True
+
+    def hidden_singles(self) -> bool:
+        """
+        Place every digit that has only one possible cell in some unit.
+
+        Returns:
+            False if a unit has no room for a digit or one cell is the only
+            place for two digits
+        """
+        domains, g = self.domains, self.geometry
+        for unit in g.units:
+            once = twice = 0
+            for cell in unit:
+                mask = domains[cell]
+                twice |= once & mask
+                once |= mask
+            if once != g.all_digits:
+                return False
+            singles = once & ~twice
+            if not singles:
+                continue
+            for cell in unit:
+                mask = domains[cell] & singles
+                if mask and mask != domains[cell]:
+                    if g.popcount[mask] > 1 or not self.narrow(cell, mask):
+                        return False
+        return True
+
+    def naked_subsets(self) -> bool:
+        """
+        Apply naked pairs and triples.
+
+        When k cells of a unit share only k candidates between them, those
+        digits are removed from the unit's other cells.
+
+        Returns:
+            False if a domain wiped out
+        """
+        domains, popcount = self.domains, self.geometry.popcount
+        for unit in self.geometry.units:
+            for k in (2, 3):
+                open_cells = [cell for cell in unit if 2 <= popcount[domains[cell]] <= k]
+                for subset in combinations(open_cells, k):
+                    union = 0
+                    for cell in subset:
+                        union |= domains[cell]
+                    if popcount[union] != k:
+                        continue
+                    for cell in unit:
+                        if cell not in subset and domains[cell] & union:
+                            if not self.narrow(cell, domains[cell] & ~union):
+                                return False
+        return True
+
+    def box_line_reduction(self) -> bool:
+        """
+        Apply pointing and claiming on each box/line intersection.
+
+        Pointing: a digit confined to the intersection within the box is
+        removed from the rest of the line. Claiming: a digit confined to the
+        intersection within the line is removed from the rest of the box.
+
+        Returns:
+            False if a domain wiped out
+        """
+        domains = self.domains
+        for segment, box_rest, line_rest in self.geometry.intersections:
+            inside = box_mask = line_mask = 0
+            for cell in segment:
+                inside |= domains[cell]
+            for cell in box_rest:
+                box_mask |= domains[cell]
+            for cell in line_rest:
+                line_mask |= domains[cell]
+            for confined, others in ((inside & ~box_mask, line_rest),
+                                     (inside & ~line_mask, box_rest)):
+                if not confined:
+                    continue
+                for cell in others:
+                    if domains[cell] & confined:
+                        if not self.narrow(cell, domains[cell] & ~confined):
+                            return False
+        return True
+
+    def infer(self, cell: int, value: int, use_fc: bool = False, use_mac: bool = False,
+              propagators: Sequence[Callable[['SudokuCSP'], bool]] = ()) -> bool:
+        """
+        Run the configured inference right after assigning value to cell.
+
+        Args:
+            cell: Flat index of the assigned variable
+            value: Assigned value
+            use_fc: Use Forward Checking
+            use_mac: Maintain arc consistency (subsumes forward checking)
+            propagators: Unit-level rules run to a fixpoint; implies use_mac
+
+        Returns:
+            False if inference proved the assignment inconsistent
+        """
+        if use_mac or propagators:
+            marker = len(self.trail)
+            if not self.maintain_arc_consistency(cell, value):
+                return False
+            # A forced assignment that pruned nothing leaves the previous
+            # fixpoint intact
+            if propagators and len(self.trail) != marker:
+                return self.propagate(propagators)
+            return True
+        return not use_fc or self.forward_check(cell, value)
+
+    def backtrack(self, use_mrv: bool = False, use_lcv: bool = False,
+                    use_fc: bool = False, use_mac: bool = False,
+                    propagators: Sequence[Callable[['SudokuCSP'], bool]] = ()) -> bool:
         """
         Recursive backtracking search to solve the CSP.
-        
+
         Args:
             use_mrv: Use Minimum Remaining Values heuristic for variable selection
             use_lcv: Use Least Constraining Value heuristic for value ordering
             use_fc: Use Forward Checking for constraint propagation
-        
+            use_mac: Maintain arc consistency after each assignment (subsumes
+                forward checking)
+            propagators: Unit-level rules run to a fixpoint after each
+                assignment; implies use_mac
+
+        Returns:
+            True if solution found, False otherwise
+        """
+        cell = self.select_unassigned_variable(use_mrv)
+        if cell is None:
+            return True
+
+        for value in self.order_domain_values(cell, use_lcv):
+            if not self.is_consistent(cell, value):
+                continue
+            marker = len(self.trail)
+            self._assign(cell, value)
+            if self.infer(cell, value, use_fc, use_mac, propagators):
+                if self.backtrack(use_mrv, use_lcv, use_fc, use_mac, propagators):
+                    return True
+            self.restore_domains(marker)
+            self._unassign(cell, value)
+        return False
+
+    def _backjumped(self, levels: int):
+        """Hook for attach_stats(): a failure skipped levels search levels."""
+
+    def backjump(self, use_mrv: bool = False, use_lcv: bool = False,
+                 use_fc: bool = False, use_mac: bool = False,
+                 propagators: Sequence[Callable[['SudokuCSP'], bool]] = ()) -> bool:
+        """
+        backtrack() with conflict-directed backjumping (FC-CBJ).
+
+        Every search depth keeps a conflict set: the earlier depths whose
+        assignments caused its values to fail. A cell's pruners are the
+        depths whose forward checking removed values from its domain; a
+        wipeout blames the pruners of the emptied cell, and a value clashing
+        with an assigned peer blames that peer. Once every value of a depth
+        has failed, the search jumps straight back to the latest depth in
+        its conflict set (plus its own pruners), which inherits the rest of
+        the set, instead of retrying values in between that cannot help.
+
+        Removals made by MAC or the unit-level rules are not traced to single
+        assignments; they are blamed on every depth so far, which is sound
+        but backtracks chronologically for those failures.
+
+        Each conflict set is also a nogood: its assignments together leave
+        the failed cell without a value. Nogoods of at most NOGOOD_SIZE
+        assignments are stored in a NogoodCache, and a later assignment that
+        would complete one fails at once. A nogood only holds under the
+        givens it was learned with, so every call starts a cache of its own.
+
+        Args:
+            use_mrv, use_lcv, use_fc, use_mac, propagators: Same as backtrack()
+
+        Returns:
+            True if solution found, False otherwise
+        """
+        nogoods = NogoodCache()
+        select, order = self.select_unassigned_variable, self.order_domain_values
+        is_consistent, infer = self.is_consistent, self.infer
+        assign, unassign, restore = self._assign, self._unassign, self.restore_domains
+        trail, values, peers = self.trail, self.values, self.geometry.peers
+        # Forward checking alone removes values for one assignment only
+        exact = not (use_mac or propagators)
+
+        levels = len(values)
+        # Bitmasks over depths: pruners[cell] narrowed cell's domain,
+        # conflicts[depth] made values at depth fail
+        pruners = [0] * levels
+        conflicts = [0] * levels
+        depth_of = [-1] * levels  # search depth of each assigned cell
+        cells = [0] * levels
+
+        def visit(depth: int) -> int:
+            """Search below depth; -2 when solved, else the depth to resume at."""
+            cell = select(use_mrv)
+            if cell is None:
+                return -2
+            bit = 1 << depth
+            earlier = bit - 1
+            conflicts[depth] = 0
+            cells[depth] = cell
+            for value in order(cell, use_lcv):
+                if not is_consistent(cell, value):
+                    for p in peers[cell]:
+                        if values[p] == value and depth_of[p] >= 0:
+                            conflicts[depth] |= 1 << depth_of[p]
+                    continue
+                nogood = nogoods.violated(cell, value, values)
+                if nogood is not None:
+                    for c, _ in nogood:
+                        if c != cell and depth_of[c] >= 0:
+                            conflicts[depth] |= 1 << depth_of[c]
+                    continue
+                marker = len(trail)
+                assign(cell, value)
+                depth_of[cell] = depth
+                ok = infer(cell, value, use_fc, use_mac, propagators)
+                changed = trail[marker::2]
+                blame = bit if exact else bit | earlier
+                for p in changed:
+                    pruners[p] |= blame
+                if ok:
+                    jump = visit(depth + 1)
+                    if jump == -2:
+                        return -2
+                else:
+                    conflicts[depth] |= pruners[changed[-1]] if exact and changed else blame
+                    jump = depth
+                for p in changed:
+                    pruners[p] &= earlier
+                restore(marker)
+                unassign(cell, value)
+                depth_of[cell] = -1
+                if jump < depth:
+                    return jump  # Still unwinding to an earlier culprit
+
+            # Every value failed: jump to the latest culprit, handing it the rest
+            culprits = (conflicts[depth] | pruners[cell]) & earlier
+            target = culprits.bit_length() - 1
+            if target >= 0:
+                conflicts[target] |= culprits ^ (1 << target)
+                if target < depth - 1:
+                    self._backjumped(depth - 1 - target)
+                if bin(culprits).count("1") <= nogoods.max_literals:
+                    nogoods.add([(cells[d], values[cells[d]]) for d in range(target + 1)
+                                 if culprits >> d & 1])
+            return target
+
+        return visit(0) == -2
+
+    def search(self, use_mrv: bool = False, use_lcv: bool = False,
+               use_fc: bool = False, use_mac: bool = False,
+               propagators: Sequence[Callable[['SudokuCSP'], bool]] = ()) -> bool:
+        """
+        Iterative equivalent of backtrack() driven by an explicit stack.
+
+        Explores the same tree in the same order, without Python recursion.
+        Each depth keeps its cell, ordered values, next value index, assigned
+        value and trail marker in arrays preallocated for one level per cell.
+
+        It is no faster than backtrack(): both spend their time in the same
+        select/order/infer calls, and the stack bookkeeping costs about what
+        the recursive calls save. Recursion depth is not a limit either, as
+        backtrack() goes at most one level per cell (625 on 25x25, under
+        Python's default limit of 1000). What this version offers is the
+        search state as plain data, which can be inspected at any depth.
+
+        Args:
+            Same as backtrack()
+
         Returns:
             True if solution found, False otherwise
         """
-        # TODO
-        raise NotImplementedError()
-    
+        # Bound once; the hooks of attach_stats()/attach_budget() are
+        # instance attributes, so they are picked up here too
+        select, order = self.select_unassigned_variable, self.order_domain_values
+        is_consistent, infer = self.is_consistent, self.infer
+        assign, unassign, restore = self._assign, self._unassign, self.restore_domains
+        trail = self.trail
+
+        levels = len(self.values)
+        cells = [0] * levels
+        choices: List[List[int]] = [[]] * levels
+        next_choice = [0] * levels
+        assigned = [0] * levels  # value tried at this depth, 0 if none
+        markers = [0] * levels
+
+        cell = select(use_mrv)
+        if cell is None:
+            return True
+        depth = 0
+        cells[0], choices[0], next_choice[0], assigned[0] = \
+            cell, order(cell, use_lcv), 0, 0
+
+        while depth >= 0:
+            cell = cells[depth]
+            # Retract the value that failed below this level
+            if assigned[depth]:
+                restore(markers[depth])
+                unassign(cell, assigned[depth])
+                assigned[depth] = 0
+
+            values, i = choices[depth], next_choice[depth]
+            while i < len(values):
+                value = values[i]
+                i += 1
+                if not is_consistent(cell, value):
+                    continue
+                markers[depth] = len(trail)
+                assign(cell, value)
+                if infer(cell, value, use_fc, use_mac, propagators):
+                    assigned[depth] = value
+                    break
+                restore(markers[depth])
+                unassign(cell, value)
+            next_choice[depth] = i
+
+            if not assigned[depth]:
+                depth -= 1  # Values exhausted: backtrack
+                continue
+
+            cell = select(use_mrv)
+            if cell is None:
+                return True
+            depth += 1
+            cells[depth], choices[depth], next_choice[depth], assigned[depth] = \
+                cell, order(cell, use_lcv), 0, 0
+        return False
+
+    def count(self, limit: int, use_mrv: bool = False, use_fc: bool = False,
+              use_mac: bool = False,
+              propagators: Sequence[Callable[['SudokuCSP'], bool]] = ()) -> int:
+        """
+        Backtracking search that counts solutions instead of stopping at one.
+
+        Every complete assignment is counted and retracted like a failure,
+        so the search goes on until limit solutions are found or the tree is
+        exhausted. Value order does not change the count, so there is no LCV.
+
+        Args:
+            limit: Stop once this many solutions are found (at least 1)
+            use_mrv, use_fc, use_mac, propagators: Same as backtrack()
+
+        Returns:
+            Number of solutions below the current assignment, at most limit
+        """
+        cell = self.select_unassigned_variable(use_mrv)
+        if cell is None:
+            return 1
+
+        found = 0
+        for value in self.order_domain_values(cell, False):
+            if not self.is_consistent(cell, value):
+                continue
+            marker = len(self.trail)
+            self._assign(cell, value)
+            if self.infer(cell, value, use_fc, use_mac, propagators):
+                found += self.count(limit - found, use_mrv, use_fc, use_mac, propagators)
+            self.restore_domains(marker)
+            self._unassign(cell, value)
+            if found >= limit:
+                break
+        return found
+
     def get_solution(self) -> List[List[str]]:
         """
         Get the current grid as the solution.
-        
+
         Returns:
-            9x9 grid as list of lists of strings
+            n x n grid as list of lists of value tokens
         """
-        return [row[:] for row in self.grid]
\ No newline at end of file
+        n = self.size
+        return [[str(self.values[r * n + c]) for c in range(n)] for r in range(n)]
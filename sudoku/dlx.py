@@ -0,0 +1,318 @@
+from typing import List, Optional, Tuple
+
+
+# Column layout of the 324 exact-cover constraints:
+#   0-80    cell (r, c) holds a digit
+#   81-161  row r holds digit d
+#   162-242 column c holds digit d
+#   243-323 box b holds digit d
+N_COLUMNS = 4 * 81
+N_CANDIDATES = 9 * 81
+
+
+def _candidate_columns(r: int, c: int, d: int) -> tuple:
+    """Columns covered by placing digit d (1-9) at (r, c)."""
+    b = (r // 3) * 3 + c // 3
+    return (r * 9 + c, 81 + r * 9 + d - 1, 162 + c * 9 + d - 1, 243 + b * 9 + d - 1)
+
+
+def _build_matrix() -> tuple:
+    """
+    Link the full 729 x 324 matrix.
+
+    Returns:
+        (left, right, up, down, column, row, size, first_node) lists
+    """
+    n = 1 + N_COLUMNS + 4 * N_CANDIDATES
+    left = [0] * n
+    right = [0] * n
+    up = list(range(n))
+    down = list(range(n))
+    column = [0] * n
+    row = [0] * n  # candidate index r * 81 + c * 9 + d - 1
+    size = [0] * (1 + N_COLUMNS)
+
+    # Header ring
+    for i in range(1 + N_COLUMNS):
+        left[i] = i - 1
+        right[i] = i + 1
+    left[0] = N_COLUMNS
+    right[N_COLUMNS] = 0
+
+    # first_node[candidate] -> first of its 4 row nodes
+    first_node = [0] * N_CANDIDATES
+    node = 1 + N_COLUMNS
+    for r in range(9):
+        for c in range(9):
+            for d in range(1, 10):
+                cand = r * 81 + c * 9 + d - 1
+                first_node[cand] = node
+                first = node
+                for col in _candidate_columns(r, c, d):
+                    head = col + 1
+                    column[node] = head
+                    row[node] = cand
+                    # Append at the bottom of the column
+                    up[node] = up[head]
+                    down[node] = head
+                    down[up[head]] = node
+                    up[head] = node
+                    size[head] += 1
+                    # Link into the row ring
+                    left[node] = node - 1
+                    right[node] = node + 1
+                    node += 1
+                left[first] = node - 1
+                right[node - 1] = first
+    return left, right, up, down, column, row, size, first_node
+
+
+# Built once at import; every solver starts from a copy
+_MATRIX = _build_matrix()
+
+
+class DancingLinks:
+    """
+    Sudoku as an exact-cover problem solved by Knuth's Algorithm X.
+
+    The 729 candidate rows (r, c, d) over 324 constraint columns are stored
+    as circular doubly linked lists in flat parallel arrays. Node 0 is the
+    root, nodes 1..324 are column headers, the rest are the 4 nodes of each
+    candidate row.
+    """
+
+    def __init__(self):
+        """Start from a fresh copy of the full matrix."""
+        left, right, up, down, column, row, size, first_node = _MATRIX
+        self.left, self.right = left[:], right[:]
+        self.up, self.down = up[:], down[:]
+        self.size = size[:]
+        # Never modified, so shared
+        self.column, self.row, self.first_node = column, row, first_node
+
+    def attach_budget(self, budget):
+        """
+        Charge every search node to budget, a csp.SearchBudget, which may
+        abort the search with csp.SearchAborted.
+
+        As in SudokuCSP.attach_budget(), search() and count() are wrapped on
+        this instance only; budget.start() is called here.
+        """
+        budget.start()
+        search, count = self.search, self.count
+
+        def charged_search(chosen):
+            budget.charge()
+            return search(chosen)
+
+        def charged_count(limit):
+            budget.charge()
+            return count(limit)
+
+        self.search = charged_search
+        self.count = charged_count
+
+    def _cover(self, head: int):
+        """Remove column head and every row that intersects it."""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        right[left[head]] = right[head]
+        left[right[head]] = left[head]
+        i = down[head]
+        while i != head:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, head: int):
+        """Exact inverse of _cover(head)."""
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        i = up[head]
+        while i != head:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[head]] = head
+        left[right[head]] = head
+
+    def _select(self, node: int):
+        """Take the row containing node into the solution (cover its columns)."""
+        j = node
+        while True:
+            self._cover(self.column[j])
+            j = self.right[j]
+            if j == node:
+                break
+
+    def search(self, chosen: List[int]) -> bool:
+        """
+        Algorithm X: cover the smallest column, try each of its rows.
+
+        Args:
+            chosen: Candidate indices selected so far; extended in place
+
+        Returns:
+            True if every column got covered
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            return True
+
+        # Smallest column first
+        head, best = 0, N_CANDIDATES + 1
+        j = right[0]
+        while j != 0:
+            if size[j] < best:
+                head, best = j, size[j]
+                if best <= 1:
+                    break
+            j = right[j]
+        if best == 0:
+            return False
+
+        self._cover(head)
+        i = down[head]
+        while i != head:
+            chosen.append(self.row[i])
+            j = self.right[i]
+            while j != i:
+                self._cover(self.column[j])
+                j = self.right[j]
+            if self.search(chosen):
+                return True
+            j = self.left[i]
+            while j != i:
+                self._uncover(self.column[j])
+                j = self.left[j]
+            chosen.pop()
+            i = down[i]
+        self._uncover(head)
+        return False
+
+    def count(self, limit: int) -> int:
+        """
+        Algorithm X that keeps going past each solution.
+
+        Args:
+            limit: Stop once this many exact covers are found (at least 1)
+
+        Returns:
+            Number of exact covers of the remaining columns, at most limit
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            return 1
+
+        head, best = 0, N_CANDIDATES + 1
+        j = right[0]
+        while j != 0:
+            if size[j] < best:
+                head, best = j, size[j]
+                if best <= 1:
+                    break
+            j = right[j]
+        if best == 0:
+            return 0
+
+        found = 0
+        self._cover(head)
+        i = down[head]
+        while i != head and found < limit:
+            j = self.right[i]
+            while j != i:
+                self._cover(self.column[j])
+                j = self.right[j]
+            found += self.count(limit - found)
+            j = self.left[i]
+            while j != i:
+                self._uncover(self.column[j])
+                j = self.left[j]
+            i = down[i]
+        self._uncover(head)
+        return found
+
+
+def _load(grid: List[List[str]]) -> Optional[Tuple[DancingLinks, List[int]]]:
+    """
+    Select the givens of grid up front.
+
+    Returns:
+        (dlx, chosen), or None if two givens clash
+    """
+    dlx = DancingLinks()
+    chosen = []
+    # A given whose columns are already covered clashes with an earlier one
+    for r in range(9):
+        for c in range(9):
+            if grid[r][c] != '0':
+                cand = r * 81 + c * 9 + int(grid[r][c]) - 1
+                node = dlx.first_node[cand]
+                if any(dlx.right[dlx.left[h]] != h
+                       for h in (dlx.column[node + k] for k in range(4))):
+                    return None
+                dlx._select(node)
+                chosen.append(cand)
+    return dlx, chosen
+
+
+def solve(grid: List[List[str]], budget=None) -> Optional[List[List[str]]]:
+    """
+    Solve a Sudoku puzzle with Dancing Links.
+
+    Args:
+        grid: 9x9 grid where each cell is a string '0'-'9' ('0' means empty)
+        budget: If given, a csp.SearchBudget checked at every search node
+
+    Returns:
+        Solved 9x9 grid as list of lists of strings, or None if no solution exists
+
+    Raises:
+        csp.SearchAborted: If budget ran out or was cancelled
+    """
+    loaded = _load(grid)
+    if loaded is None:
+        return None
+    dlx, chosen = loaded
+    if budget is not None:
+        dlx.attach_budget(budget)
+    if not dlx.search(chosen):
+        return None
+    solution = [['0'] * 9 for _ in range(9)]
+    for cand in chosen:
+        r, rest = divmod(cand, 81)
+        c, d = divmod(rest, 9)
+        solution[r][c] = str(d + 1)
+    return solution
+
+
+def count_solutions(grid: List[List[str]], limit: int = 2, budget=None) -> int:
+    """
+    Count the solutions of a puzzle with Dancing Links, up to limit.
+
+    Args:
+        grid: 9x9 grid where each cell is a string '0'-'9' ('0' means empty)
+        limit: Stop counting at this many solutions
+        budget: If given, a csp.SearchBudget checked at every search node
+
+    Returns:
+        The number of solutions, capped at limit
+
+    Raises:
+        csp.SearchAborted: If budget ran out or was cancelled
+    """
+    loaded = _load(grid)
+    if loaded is None or limit <= 0:
+        return 0
+    dlx = loaded[0]
+    if budget is not None:
+        dlx.attach_budget(budget)
+    return dlx.count(limit)
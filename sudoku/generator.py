@@ -0,0 +1,226 @@
+"""
+Puzzle generator built on the CSP solver.
+
+    python -m sudoku generate 1000 --seed 42 --workers 4 -o puzzles.txt
+
+A puzzle starts as a random complete grid, filled by randomized search on an
+empty board. Givens are then removed in random order, each removal kept only
+while the puzzle still has a unique solution. Finally the puzzle is graded by
+the propagation it needs and by the search it takes.
+
+Every puzzle is generated from its own integer seed, so the same seed
+reproduces the same puzzles for any number of workers.
+"""
+import os
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .csp import BIT, MASK_DIGITS, POPCOUNT, SearchStats, SudokuCSP, imap_chunks, to_grid
+
+# Rules tried in grading order; each level adds to the previous ones
+SINGLES = (SudokuCSP.hidden_singles,)
+SUBSETS = (SudokuCSP.hidden_singles, SudokuCSP.naked_subsets, SudokuCSP.box_line_reduction)
+
+# Puzzles that need search are "hard" up to this many backtracks with all
+# rules on, "expert" beyond
+HARD_BACKTRACKS = 10
+
+GRADES = ("easy", "medium", "hard", "expert")
+
+
+def _fill(csp: SudokuCSP, rng: random.Random) -> bool:
+    """Complete csp by MRV search with MAC, trying values in random order."""
+    cell = csp.select_unassigned_variable(True)
+    if cell is None:
+        return True
+    values = list(MASK_DIGITS[csp.domains[cell]])
+    rng.shuffle(values)
+    for value in values:
+        marker = len(csp.trail)
+        csp._assign(cell, value)
+        if csp.infer(cell, value, use_mac=True) and _fill(csp, rng):
+            return True
+        csp.restore_domains(marker)
+        csp._unassign(cell, value)
+    return False
+
+
+def random_grid(rng: random.Random) -> str:
+    """
+    Random complete grid: MRV search with MAC on an empty board, trying the
+    candidates of each cell in shuffled order.
+
+    Args:
+        rng: Source of randomness
+
+    Returns:
+        The grid as 81 digits
+    """
+    csp = SudokuCSP(to_grid("0" * 81))
+    csp.enable_mrv_buckets()
+    _fill(csp, rng)
+    return "".join(map(str, csp.values))
+
+
+def _prepared(puzzle: List[str], propagators: Sequence[Callable[[SudokuCSP], bool]],
+              stats: Optional[SearchStats] = None) -> Optional[SudokuCSP]:
+    """SudokuCSP for puzzle after AC-3 and propagators, or None on a wipeout."""
+    csp = SudokuCSP(to_grid("".join(puzzle)))
+    if stats is not None:
+        csp.attach_stats(stats)
+    if not all(csp.domains):
+        return None
+    csp.enable_mrv_buckets()
+    if not csp.ac3() or not csp.propagate(propagators):
+        return None
+    return csp
+
+
+def _has_other_solution(puzzle: List[str], cell: int, digit: int) -> bool:
+    """
+    True if puzzle has a solution with something other than digit at cell.
+
+    When puzzle was unique before cell was blanked, with digit there, this
+    is exactly the question of whether blanking it broke uniqueness: any
+    second solution has to differ at cell. Finding one solution is much
+    cheaper than proving there is no second one.
+    """
+    csp = SudokuCSP(to_grid("".join(puzzle)))
+    csp.enable_mrv_buckets()
+    if not csp.narrow(cell, csp.domains[cell] & ~BIT[digit]):
+        return False
+    if not csp.ac3() or not csp.propagate(SINGLES):
+        return False
+    return csp.count(1, use_mrv=True, use_mac=True, propagators=SINGLES) > 0
+
+
+def carve(solution: str, rng: random.Random, *, min_givens: int = 17,
+          symmetric: bool = False) -> str:
+    """
+    Blank cells of a complete grid while the puzzle stays uniquely solvable.
+
+    Args:
+        solution: Complete grid as 81 digits
+        rng: Source of randomness for the removal order
+        min_givens: Stop removing at this many givens
+        symmetric: Blank cells in pairs mirrored through the centre
+
+    Returns:
+        The puzzle as 81 digits, '0' for blanks
+    """
+    puzzle = list(solution)
+    givens = 81
+    order = list(range(41 if symmetric else 81))
+    rng.shuffle(order)
+    for cell in order:
+        cells = (cell, 80 - cell) if symmetric and cell != 40 else (cell,)
+        if givens - len(cells) < min_givens:
+            continue
+        for c in cells:
+            puzzle[c] = "0"
+        if any(_has_other_solution(puzzle, c, int(solution[c])) for c in cells):
+            for c in cells:
+                puzzle[c] = solution[c]
+        else:
+            givens -= len(cells)
+    return "".join(puzzle)
+
+
+def grade(puzzle: str) -> Dict[str, Any]:
+    """
+    Grade a uniquely solvable puzzle.
+
+    "easy" puzzles fall to naked and hidden singles alone, "medium" ones
+    also need naked subsets or box-line reduction, and the rest need search:
+    "hard" up to HARD_BACKTRACKS backtracks with every rule on, "expert"
+    beyond.
+
+    Args:
+        puzzle: 81 digits, '0' for blanks
+
+    Returns:
+        Dict with grade, the techniques needed, and nodes and backtracks of
+        the search with every rule on
+    """
+    techniques = ["singles"]
+    csp = _prepared(list(puzzle), SINGLES)
+    solved = csp is not None and all(POPCOUNT[m] == 1 for m in csp.domains)
+    level = 0
+    if not solved:
+        techniques.append("subsets")
+        csp = _prepared(list(puzzle), SUBSETS)
+        solved = csp is not None and all(POPCOUNT[m] == 1 for m in csp.domains)
+        level = 1
+    stats = SearchStats()
+    if not solved:
+        techniques.append("search")
+        csp = _prepared(list(puzzle), SUBSETS, stats)
+        if csp is not None:
+            csp.backtrack(use_mrv=True, use_mac=True, propagators=SUBSETS)
+        level = 2 if stats.backtracks <= HARD_BACKTRACKS else 3
+    return {
+        "grade": GRADES[level],
+        "techniques": techniques,
+        "nodes": stats.nodes,
+        "backtracks": stats.backtracks,
+    }
+
+
+def generate(seed: Optional[int] = None, *, min_givens: int = 17,
+             symmetric: bool = False) -> Dict[str, Any]:
+    """
+    Generate and grade one puzzle.
+
+    Args:
+        seed: Seed for this puzzle; None draws one from the system
+        min_givens: Stop removing givens at this many
+        symmetric: Keep the givens symmetric through the centre
+
+    Returns:
+        Dict with seed, puzzle, solution, givens and the fields of grade()
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    rng = random.Random(seed)
+    solution = random_grid(rng)
+    puzzle = carve(solution, rng, min_givens=min_givens, symmetric=symmetric)
+    return {
+        "seed": seed,
+        "puzzle": puzzle,
+        "solution": solution,
+        "givens": 81 - puzzle.count("0"),
+        **grade(puzzle),
+    }
+
+
+def _generate_chunk(seeds: List[int], opts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Generate one puzzle per seed (pool task)."""
+    return [generate(seed, **opts) for seed in seeds]
+
+
+def generate_many(count: int, *, seed: Optional[int] = None, workers: Optional[int] = None,
+                  chunksize: int = 8, **opts: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily generate count puzzles, optionally across a process pool.
+
+    Per-puzzle seeds are drawn from one generator seeded with seed, so the
+    output depends only on seed and opts. As in csp.iter_solve, chunks run
+    through csp.imap_chunks, so at most a few per worker are in flight.
+
+    Args:
+        count: Number of puzzles
+        seed: Master seed; None draws one from the system
+        workers: Number of worker processes (default: os.cpu_count()); 1 or
+            fewer generates in this process
+        chunksize: Puzzles per worker task
+        **opts: Keyword options for generate()
+
+    Yields:
+        generate() results, in seed order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    master = random.Random(seed)
+    seeds = (master.getrandbits(64) for _ in range(count))
+    yield from imap_chunks(_generate_chunk, seeds, workers=workers, chunksize=chunksize,
+                           args=(opts,))
@@ -0,0 +1,303 @@
+"""
+Portfolio solver: race several solver configurations across processes.
+
+    python -m sudoku solve puzzles.txt --portfolio --stats --winners winners.txt
+
+No flag set of solve() is best on every puzzle, and search time is heavy
+tailed: a configuration that is fast on most puzzles can be stuck on a few
+that another one solves at once. PortfolioSolver keeps one worker process
+per configuration, hands each puzzle to all of them and returns the first
+answer. The other workers drop the puzzle within SearchBudget.CHECK_EVERY
+(64) nodes, since every budget they run under checks a shared job counter
+that often. Wins are counted per configuration.
+
+A configuration with a "seed" breaks MRV and value-order ties at random
+and restarts with a fresh tie-breaking after each run of LUBY_UNIT * luby(i)
+nodes, so one unlucky early choice cannot hold up the whole search.
+"""
+import multiprocessing
+import os
+import queue
+import random
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .csp import SearchAborted, SearchBudget, _prepare, from_grid, solve, to_grid
+
+# Configurations raced by default, as (name, solve() options); a "seed"
+# option selects solve_randomized() with that seed. A machine with few
+# cores races only a prefix, so the order alternates inference strength,
+# randomized restarts and search algorithms: any two already differ in both
+PORTFOLIO: Tuple[Tuple[str, Dict[str, Any]], ...] = (
+    ("mrv+fc", dict(use_mrv=True, use_fc=True)),
+    ("random-mac", dict(use_mrv=True, use_mac=True, use_hidden_singles=True, seed=2)),
+    ("dlx", dict(engine="dlx")),
+    ("random-fc", dict(use_mrv=True, use_fc=True, seed=1)),
+    ("mrv+mac+singles", dict(use_mrv=True, use_mac=True, use_hidden_singles=True)),
+    ("mrv+fc+lcv+cbj", dict(use_mrv=True, use_fc=True, use_lcv=True, use_cbj=True)),
+)
+
+# Nodes in the shortest restart run of solve_randomized()
+LUBY_UNIT = 64
+
+# Seconds between checks of a budget while waiting for the workers
+POLL_SECONDS = 0.05
+
+
+def luby(i: int) -> int:
+    """The i-th term (from 1) of the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if i == (1 << k) - 1:
+        return 1 << (k - 1)
+    return luby(i - (1 << (k - 1)) + 1)
+
+
+def solve_randomized(grid: List[List[str]], seed: int, *,
+                     budget: Optional[SearchBudget] = None,
+                     **opts: Any) -> Optional[List[List[str]]]:
+    """
+    solve() with random tie-breaking and Luby restarts.
+
+    Among the cells with the fewest candidates, MRV picks one at random, and
+    values are tried in random order (use_lcv is ignored). Run i stops after
+    LUBY_UNIT * luby(i) nodes and starts over with new random choices. The
+    limits grow without bound, so the search is still complete.
+
+    Random MRV needs the MRV buckets, i.e. use_mrv with some inference
+    (use_fc, use_mac or a unit rule); otherwise only values are shuffled.
+
+    Args:
+        grid: n x n grid of value tokens ('0' means empty), as for solve()
+        seed: Seed for the tie-breaking
+        budget: If given, charged for every node of every run
+        **opts: Keyword options for solve() (csp engine only)
+
+    Returns:
+        Solved grid, or None if no solution exists
+
+    Raises:
+        SearchAborted: If budget ran out or was cancelled
+    """
+    for key in ("use_lcv", "use_cbj", "engine"):
+        opts.pop(key, None)
+    rng = random.Random(seed)
+    if budget is not None:
+        budget.start()
+    run = 0
+    while True:
+        run += 1
+        prepared = _prepare(grid, **opts)
+        if prepared is None:
+            return None
+        csp, propagators = prepared
+        select, order, buckets = csp.select_unassigned_variable, csp.order_domain_values, csp.buckets
+
+        # Installed on this instance only, like SudokuCSP.attach_budget()
+        def select_unassigned_variable(use_mrv):
+            if budget is not None:
+                budget.charge()
+            if buckets is None or not use_mrv:
+                return select(use_mrv)
+            for bucket in buckets:
+                if bucket:
+                    return rng.choice(tuple(bucket))
+            return None
+
+        def order_domain_values(cell, use_lcv):
+            values = order(cell, False)
+            rng.shuffle(values)
+            return values
+
+        csp.select_unassigned_variable = select_unassigned_variable
+        csp.order_domain_values = order_domain_values
+        restart = SearchBudget(max_nodes=LUBY_UNIT * luby(run))
+        csp.attach_budget(restart)
+        try:
+            if csp.backtrack(use_mrv=opts.get("use_mrv", False), use_fc=opts.get("use_fc", False),
+                             use_mac=opts.get("use_mac", False), propagators=propagators):
+                return csp.get_solution()
+            return None
+        except SearchAborted:
+            if restart.nodes <= restart.max_nodes:
+                raise  # the caller's budget, not the restart limit
+
+
+class _JobBudget(SearchBudget):
+    """SearchBudget that aborts once the portfolio moves past job."""
+
+    def __init__(self, current, job: int):
+        super().__init__()
+        self.current = current
+        self.job = job
+
+    def charge(self):
+        self.nodes += 1
+        if not self.nodes % self.CHECK_EVERY and self.current.value != self.job:
+            raise SearchAborted("superseded")
+
+
+def _run(grid: List[List[str]], opts: Dict[str, Any], budget: SearchBudget):
+    opts = dict(opts)
+    seed = opts.pop("seed", None)
+    if seed is not None:
+        return solve_randomized(grid, seed, budget=budget, **opts)
+    return solve(grid, budget=budget, **opts)
+
+
+def _worker(name: str, opts: Dict[str, Any], tasks, results, current):
+    """Worker process: solve each (job, grid) from tasks with opts."""
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        job, grid = task
+        if current.value != job:
+            continue  # already answered
+        t0 = time.perf_counter()
+        try:
+            sol = _run(grid, opts, _JobBudget(current, job))
+        except SearchAborted:
+            continue
+        except Exception as e:
+            results.put((job, name, False, f"{name}: {e}", time.perf_counter() - t0))
+            continue
+        results.put((job, name, True, sol, time.perf_counter() - t0))
+
+
+class PortfolioSolver:
+    """
+    Pool of worker processes, one per configuration, racing on each puzzle.
+
+    Use as a context manager, or call close() when done.
+
+    Attributes:
+        configs: The (name, options) pairs being raced
+        wins: Puzzles answered first, per configuration name
+    """
+
+    def __init__(self, configs: Optional[Sequence[Tuple[str, Dict[str, Any]]]] = None, *,
+                 workers: Optional[int] = None, start_method: Optional[str] = None):
+        """
+        Start the workers.
+
+        Args:
+            configs: (name, options) pairs; options are solve() keywords plus
+                an optional "seed" (see solve_randomized)
+            workers: Race only the first this many configs (default: one per
+                CPU, at least 2); PORTFOLIO is ordered so that any prefix
+                mixes flag sets and seeded restarts
+            start_method: multiprocessing start method for the workers
+                (default: the platform's); use "spawn" or "forkserver" from
+                a process that runs threads, such as the GUI
+        """
+        if configs is None:
+            configs = PORTFOLIO
+        if workers is None:
+            workers = max(2, os.cpu_count() or 1)
+        self.configs = list(configs)[:max(1, workers)]
+        self.wins: Dict[str, int] = {name: 0 for name, _ in self.configs}
+        ctx = multiprocessing.get_context(start_method)
+        # Id of the puzzle being raced; workers abandon any other one
+        self._current = ctx.RawValue("q", 0)
+        self._results = ctx.Queue()
+        self._tasks = []
+        self._procs = []
+        self._job = 0
+        for name, opts in self.configs:
+            tasks = ctx.Queue()
+            proc = ctx.Process(target=_worker, daemon=True,
+                               args=(name, opts, tasks, self._results, self._current))
+            proc.start()
+            self._tasks.append(tasks)
+            self._procs.append(proc)
+
+    def __enter__(self) -> "PortfolioSolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self):
+        """Stop the workers."""
+        self._current.value = -1
+        for tasks in self._tasks:
+            tasks.put(None)
+        for proc in self._procs:
+            proc.join(1)
+            if proc.is_alive():
+                proc.terminate()
+        self._procs = []
+
+    def solve(self, grid: List[List[str]], *,
+              budget: Optional[SearchBudget] = None) -> Tuple[Optional[List[List[str]]], str]:
+        """
+        Race every applicable configuration on grid.
+
+        The dlx engine is skipped on boards other than 9x9.
+
+        Args:
+            grid: n x n grid of value tokens ('0' means empty), as for solve()
+            budget: If given, its max_seconds and cancel() stop the race
+                (max_nodes is not enforced)
+
+        Returns:
+            (solution or None, name of the configuration that answered)
+
+        Raises:
+            SearchAborted: If budget ran out or was cancelled
+            ValueError: If no configuration applies, or every one failed
+        """
+        self._job += 1
+        job = self._job
+        self._current.value = job
+        racing = 0
+        for (name, opts), tasks in zip(self.configs, self._tasks):
+            if opts.get("engine") == "dlx" and len(grid) != 9:
+                continue
+            tasks.put((job, grid))
+            racing += 1
+        if not racing:
+            raise ValueError("No portfolio configuration supports this board")
+        if budget is not None:
+            budget.start()
+
+        errors: List[str] = []
+        while True:
+            try:
+                done, name, ok, payload, _ = self._results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                if budget is not None:
+                    reason = None
+                    if budget.cancelled:
+                        reason = "cancelled"
+                    elif budget.max_seconds is not None and budget.elapsed() > budget.max_seconds:
+                        reason = f"time budget of {budget.max_seconds:g} s exhausted"
+                    if reason:
+                        self._current.value = 0
+                        raise SearchAborted(reason)
+                continue
+            if done != job:
+                continue  # a late answer to an earlier puzzle
+            if not ok:
+                errors.append(payload)
+                if len(errors) == racing:
+                    self._current.value = 0
+                    raise ValueError("; ".join(errors))
+                continue
+            self._current.value = 0  # stop the others
+            self.wins[name] += 1
+            return payload, name
+
+    def iter_solve(self, puzzles: Iterable[str]) -> Iterator[Tuple[Optional[str], float, str]]:
+        """
+        Race on a stream of 81-digit puzzles.
+
+        Yields:
+            (solution or None, seconds, winning configuration) per puzzle
+        """
+        for puzzle in puzzles:
+            t0 = time.perf_counter()
+            sol, name = self.solve(to_grid(puzzle))
+            yield None if sol is None else from_grid(sol), time.perf_counter() - t0, name
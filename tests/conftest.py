@@ -0,0 +1,30 @@
+"""Helpers shared by the test modules."""
+from sudoku import dlx
+
+
+def grid(puzzle):
+    """81-digit puzzle -> 9x9 grid of value tokens."""
+    return [list(puzzle[r * 9:r * 9 + 9]) for r in range(9)]
+
+
+def reference(puzzle):
+    """Solution of an 81-digit puzzle from Dancing Links, or None."""
+    sol = dlx.solve(grid(puzzle))
+    return None if sol is None else "".join(map("".join, sol))
+
+
+def assert_solves(puzzle_grid, solution):
+    """solution is a complete, valid grid keeping every given of puzzle_grid."""
+    n = len(puzzle_grid)
+    k = int(n ** 0.5)
+    digits = {str(d) for d in range(1, n + 1)}
+    assert all(set(row) == digits for row in solution)
+    assert all({solution[r][c] for r in range(n)} == digits for c in range(n))
+    for br in range(0, n, k):
+        for bc in range(0, n, k):
+            box = {solution[r][c] for r in range(br, br + k) for c in range(bc, bc + k)}
+            assert box == digits
+    for r in range(n):
+        for c in range(n):
+            if puzzle_grid[r][c] != "0":
+                assert solution[r][c] == puzzle_grid[r][c]
@@ -0,0 +1,40 @@
+"""Vectorized batch propagation (needs NumPy)."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from conftest import reference
+from sudoku import batch
+from sudoku.puzzles import PUZZLES
+
+UNSOLVABLE = "503020600900305001001806400008102900700000008006708200002609500800203009005010300"
+# Row 0 holds 1-8 and column 8 a 9 further down: cell (0, 8) has no candidate
+NO_CANDIDATE = "123456780" + "000000009" + "0" * 63
+CLASH = "55" + PUZZLES[0][2:]
+
+
+def test_propagate_detects_contradictions():
+    puzzles = [UNSOLVABLE, NO_CANDIDATE, CLASH]
+    values, _, status = batch.propagate(batch.to_array(puzzles))
+    assert list(status) == [batch.CONTRADICTION] * 3
+
+
+def test_propagate_keeps_solutions():
+    puzzles = PUZZLES[:8]
+    values, masks, status = batch.propagate(batch.to_array(puzzles))
+    assert batch.SOLVED in status and batch.OPEN in status
+    for puzzle, filled, state in zip(puzzles, batch.to_strings(values), status):
+        solution = reference(puzzle)
+        if state == batch.SOLVED:
+            assert filled == solution
+        else:
+            assert state == batch.OPEN
+            assert all(d in ("0", s) for d, s in zip(filled, solution))
+
+
+def test_solve_batch_matches_dlx():
+    puzzles = PUZZLES[:8] + [UNSOLVABLE, CLASH]
+    expected = [reference(p) for p in puzzles]
+    assert batch.solve_batch(puzzles, use_mrv=True, use_fc=True) == expected
+    streamed = [sol for sol, _ in batch.iter_solve(iter(puzzles), chunksize=3)]
+    assert streamed == expected
@@ -0,0 +1,40 @@
+"""Benchmark harness and latency percentiles."""
+import random
+
+from sudoku import bench
+from sudoku.bench import LatencyHistogram, percentile
+from sudoku.puzzles import PUZZLES
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
+
+
+def test_run_reports_every_config():
+    report = bench.run(PUZZLES[1:3], repeat=1, warmup=0)
+    assert len(report["results"]) == 16
+    assert report["results"][0]["options"] == dict.fromkeys(bench.FLAGS, False)
+    assert all(r["solved"] == 2 and r["nodes"] > 0 for r in report["results"])
+
+
+def test_histogram_tracks_exact_percentiles():
+    rng = random.Random(0)
+    samples = [rng.lognormvariate(-7, 1.5) for _ in range(5000)] + [1e-8, 5e3]
+    hist = LatencyHistogram()
+    for s in samples:
+        hist.add(s)
+    ordered = sorted(samples)
+    bound = 10 ** (1 / LatencyHistogram.BUCKETS_PER_DECADE)
+    for q in (0.0, 0.01, 0.5, 0.9, 0.99, 1.0):
+        exact = percentile(ordered, q)
+        if exact <= LatencyHistogram.MIN_SECONDS:
+            assert hist.quantile(q) <= LatencyHistogram.MIN_SECONDS
+        else:
+            assert exact <= hist.quantile(q) <= exact * bound
+    assert hist.count == len(samples) and hist.quantile(1.0) == 5e3
+
+
+def test_empty_histogram():
+    assert LatencyHistogram().quantile(0.5) == 0.0
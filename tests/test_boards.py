@@ -0,0 +1,72 @@
+"""Boards other than 9x9 and the token format."""
+import random
+
+import pytest
+
+from conftest import assert_solves, grid
+from sudoku.csp import count_solutions, format_tokens, geometry, parse_puzzle, parse_tokens, solve
+from sudoku.puzzles import PUZZLES
+
+ENGINES = [dict(engine="csp"), dict(engine="iterative"), dict(engine="csp", use_cbj=True)]
+
+
+def board(box, blanks, seed):
+    """A k*k x k*k puzzle: a pattern solution with blanks cells cleared."""
+    n = box * box
+    cells = [[str((box * (r % box) + r // box + c) % n + 1) for c in range(n)] for r in range(n)]
+    rng = random.Random(seed)
+    for i in rng.sample(range(n * n), blanks):
+        cells[i // n][i % n] = "0"
+    return cells
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=["csp", "iterative", "cbj"])
+@pytest.mark.parametrize("box,blanks", [(2, 10), (4, 150), (5, 120)])
+def test_other_sizes(engine, box, blanks):
+    for seed in range(3):
+        puzzle = board(box, blanks, seed)
+        for flags in (dict(use_mrv=True, use_fc=True),
+                      dict(use_mrv=True, use_mac=True, use_hidden_singles=True)):
+            sol = solve(puzzle, **flags, **engine)
+            assert sol is not None
+            assert_solves(puzzle, sol)
+    assert count_solutions(board(box, 0, 0)) == 1
+
+
+def test_clash_on_16x16():
+    puzzle = board(4, 100, 0)
+    puzzle[0][0] = puzzle[0][1] = "16"
+    assert solve(puzzle, use_mrv=True, use_fc=True) is None
+
+
+def test_geometry():
+    for box in (2, 3, 4, 5):
+        geo = geometry(box)
+        n = box * box
+        assert geo is geometry(box)
+        assert len(geo.units) == 3 * n and len(geo.peers[0]) == 3 * n - 2 * box - 1
+        mask = geo.bit[1] | geo.bit[n]
+        assert geo.popcount[mask] == 2 and tuple(geo.mask_digits[mask]) == (1, n)
+    with pytest.raises(ValueError):
+        geometry(6)
+
+
+def test_9x9_only_features():
+    with pytest.raises(ValueError):
+        solve(board(4, 10, 0), engine="dlx")
+    with pytest.raises(ValueError):
+        solve([["0"] * 5 for _ in range(5)])
+
+
+def test_tokens_round_trip():
+    puzzle = board(4, 150, 1)
+    assert parse_tokens(format_tokens(puzzle)) == puzzle
+    assert parse_tokens(",".join(v for row in puzzle for v in row)) == puzzle
+    assert parse_tokens("1.3. ..1. 3... ...1".replace(" ", "")) is not None
+    assert parse_tokens("1 2 3") is None
+
+
+def test_tokens_accept_every_puzzle_line():
+    line = "|".join(PUZZLES[0][i:i + 9] for i in range(0, 81, 9)) + " easy"
+    assert parse_puzzle(line) == PUZZLES[0]
+    assert parse_tokens(line) == grid(PUZZLES[0])
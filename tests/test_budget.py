@@ -0,0 +1,48 @@
+"""Search budgets and cancellation."""
+import threading
+
+import pytest
+
+from conftest import grid
+from sudoku.csp import SearchAborted, SearchBudget, count_solutions, solve
+from sudoku.puzzles import PUZZLES
+
+EMPTY = [["0"] * 9 for _ in range(9)]
+
+
+@pytest.mark.parametrize("engine", ["csp", "iterative", "dlx"])
+def test_cancelled_budget_stops_every_engine(engine):
+    budget = SearchBudget()
+    budget.cancel()
+    with pytest.raises(SearchAborted) as info:
+        solve(EMPTY, budget=budget, engine=engine)
+    assert info.value.reason == "cancelled"
+    with pytest.raises(SearchAborted):
+        count_solutions(EMPTY, 2, budget=budget, engine=engine)
+
+
+def test_node_budget():
+    with pytest.raises(SearchAborted) as info:
+        solve(grid(PUZZLES[0]), budget=SearchBudget(max_nodes=5))
+    assert "node budget of 5" in info.value.reason
+    budget = SearchBudget(max_nodes=10 ** 6)
+    assert solve(grid(PUZZLES[0]), use_mrv=True, use_fc=True, budget=budget) is not None
+    assert 0 < budget.nodes < 10 ** 6
+
+
+def test_time_budget():
+    # Counting every 9x9 grid never finishes; the clock has to stop it
+    with pytest.raises(SearchAborted) as info:
+        count_solutions(EMPTY, 10 ** 9, budget=SearchBudget(max_seconds=0.1))
+    assert "time budget" in info.value.reason
+
+
+def test_cancel_from_another_thread():
+    budget = SearchBudget()
+    timer = threading.Timer(0.1, budget.cancel)
+    timer.start()
+    try:
+        with pytest.raises(SearchAborted):
+            count_solutions(EMPTY, 10 ** 9, engine="dlx", budget=budget)
+    finally:
+        timer.cancel()
@@ -0,0 +1,59 @@
+"""Canonical forms and the solution cache."""
+import random
+
+from conftest import grid, reference
+from sudoku.cache import SolutionCache, canonical_form, transform
+from sudoku.csp import solve, solve_string
+from sudoku.puzzles import PUZZLES
+
+
+def test_canonical_form_maps_back():
+    for puzzle in PUZZLES[:10]:
+        form, cells, mapping = canonical_form(puzzle)
+        assert sorted(cells) == list(range(81))
+        assert form == "".join(mapping[int(puzzle[c])] for c in cells)
+
+
+def test_transforms_share_a_canonical_form():
+    rng = random.Random(0)
+    for puzzle in PUZZLES[:10]:
+        form = canonical_form(puzzle)[0]
+        for _ in range(10):
+            variant = transform(puzzle, rng)
+            assert reference(variant) is not None
+            assert canonical_form(variant)[0] == form
+
+
+def test_cache_hits_return_the_right_solution():
+    rng = random.Random(1)
+    cache = SolutionCache(maxsize=4)
+    puzzle = PUZZLES[0]
+    assert cache.solve(puzzle, solve_string) == reference(puzzle)
+    assert cache.misses == 1
+    for _ in range(5):
+        variant = transform(puzzle, rng)
+        assert cache.solve(variant, solve_string) == reference(variant)
+    assert cache.misses == 1 and cache.hits == 5
+    assert len(cache) == 1
+
+
+def test_cache_is_bounded_and_remembers_failures():
+    cache = SolutionCache(maxsize=2)
+    for puzzle in PUZZLES[:3]:
+        cache.solve(puzzle, solve_string)
+    assert len(cache) == 2 and cache.evictions > 0
+    calls = []
+    unsolvable = "55" + PUZZLES[0][2:]
+    for _ in range(2):
+        assert cache.solve(unsolvable, lambda p: calls.append(p)) is None
+    assert len(calls) == 1
+    cache.clear()
+    assert cache.info()["size"] == 0 and cache.hits == 0
+
+
+def test_solve_with_cache():
+    cache = SolutionCache()
+    rng = random.Random(2)
+    for puzzle in [PUZZLES[3], transform(PUZZLES[3], rng), PUZZLES[3]]:
+        assert solve(grid(puzzle), cache=cache, use_mrv=True, use_fc=True) == grid(reference(puzzle))
+    assert cache.info()["misses"] == 1 and cache.hits == 2
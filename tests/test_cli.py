@@ -0,0 +1,78 @@
+"""python -m sudoku command line."""
+import pytest
+
+from conftest import reference
+from sudoku.cli import main
+from sudoku.corpus import Corpus
+from sudoku.puzzles import PUZZLES
+
+CLASH = "55" + PUZZLES[0][2:]
+
+
+@pytest.fixture
+def puzzle_file(tmp_path):
+    path = tmp_path / "puzzles.txt"
+    path.write_text(f"{PUZZLES[0]}\n\n{CLASH}\nnot a puzzle\n{PUZZLES[1]} easy\n")
+    return path
+
+
+def solved_lines():
+    return [reference(PUZZLES[0]), "unsolvable", reference(PUZZLES[1])]
+
+
+@pytest.mark.parametrize("flags", [[], ["--mrv", "--fc"], ["--engine", "dlx"], ["--workers", "2"],
+                                   ["--cbj", "--fc"], ["--cache", "8"]])
+def test_solve_writes_one_line_per_puzzle(puzzle_file, tmp_path, capsys, flags):
+    out = tmp_path / "out.txt"
+    assert main(["solve", str(puzzle_file), "-o", str(out), "--stats"] + flags) == 1
+    assert out.read_text().split("\n")[:-1] == solved_lines()
+    err = capsys.readouterr().err
+    assert "line 4: expected 81 digits" in err
+    assert "puzzles: 3  solved: 2  unsolvable: 1  malformed: 1" in err
+    assert "latency p50:" in err
+
+
+def test_solve_reads_stdin(monkeypatch, capsys):
+    import io
+    monkeypatch.setattr("sys.stdin", io.StringIO(PUZZLES[2] + "\n"))
+    assert main(["solve", "--mrv", "--fc"]) == 0
+    assert capsys.readouterr().out == reference(PUZZLES[2]) + "\n"
+
+
+def test_pack_solve_and_unpack(puzzle_file, tmp_path, capsys):
+    packed = tmp_path / "p.sdk"
+    assert main(["pack", str(puzzle_file), "-o", str(packed)]) == 1
+    assert "line 4: expected 81 or 162 digits" in capsys.readouterr().err
+    with Corpus(str(packed)) as corpus:
+        assert list(corpus) == [PUZZLES[0], CLASH, PUZZLES[1]]
+    assert main(["solve", str(packed), "--mrv", "--fc"]) == 0
+    assert capsys.readouterr().out.split("\n")[:-1] == solved_lines()
+    assert main(["unpack", str(packed)]) == 0
+    assert capsys.readouterr().out == f"{PUZZLES[0]}\n{CLASH}\n{PUZZLES[1]}\n"
+
+
+def test_batch(puzzle_file, tmp_path, capsys):
+    pytest.importorskip("numpy")
+    packed = tmp_path / "p.sdk"
+    main(["pack", str(puzzle_file), "-o", str(packed)])
+    capsys.readouterr()
+    for source in (puzzle_file, packed):
+        main(["solve", str(source), "--batch", "--mrv", "--fc", "--stats"])
+        captured = capsys.readouterr()
+        assert captured.out.split("\n")[:-1] == solved_lines()
+        # Batches only give per-puzzle averages, which are no percentiles
+        assert "latency p50" not in captured.err
+        assert "ms mean (no percentiles with --batch)" in captured.err
+
+
+def test_unpack_rejects_other_files(puzzle_file, capsys):
+    assert main(["unpack", str(puzzle_file)]) == 1
+    assert "not a puzzle corpus" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("engine", ["iterative", "dlx"])
+def test_cbj_needs_csp_engine(puzzle_file, capsys, engine):
+    with pytest.raises(SystemExit) as exc:
+        main(["solve", str(puzzle_file), "--cbj", "--engine", engine])
+    assert exc.value.code == 2
+    assert "--cbj needs --engine csp" in capsys.readouterr().err
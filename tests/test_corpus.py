@@ -0,0 +1,118 @@
+"""Packed corpus files."""
+import io
+
+import pytest
+
+from conftest import reference
+from sudoku.corpus import (HEADER, MAGIC, PACKED, VERSION, Corpus, CorpusWriter, from_text,
+                           is_corpus, pack, parse_line, to_text, unpack)
+from sudoku.puzzles import PUZZLES
+
+SOLVED = [(p, reference(p)) for p in PUZZLES[:5]]
+
+
+def test_pack_round_trip():
+    for puzzle in PUZZLES:
+        assert unpack(pack(puzzle)) == puzzle
+
+
+@pytest.mark.parametrize("text", ["a" * 81, "1" * 80, "1" * 82, "٣" * 81, "12" * 40 + "-"])
+def test_pack_rejects_non_digits(text):
+    with pytest.raises(ValueError):
+        pack(text)
+
+
+def test_text_round_trip(tmp_path):
+    path = str(tmp_path / "p.sdk")
+    lines = [f"{p} {s}\n" for p, s in SOLVED] + [PUZZLES[5] + "\n", "\n"]
+    assert from_text(lines, path, solutions=True) == 6
+    assert is_corpus(path) and not is_corpus(str(tmp_path / "missing"))
+    with Corpus(path) as corpus:
+        assert len(corpus) == 6 and corpus.has_solutions
+        assert list(corpus) == [p for p, _ in SOLVED] + [PUZZLES[5]]
+        assert corpus[-1] == PUZZLES[5] and corpus.solution(5) is None
+        assert list(corpus.items())[:5] == SOLVED
+        with pytest.raises(IndexError):
+            corpus[6]
+        out = io.StringIO()
+        assert to_text(corpus, out, chunk=2) == 6
+    assert out.getvalue() == "".join(lines[:-1])
+
+
+def test_writer_validates_records(tmp_path):
+    with CorpusWriter(str(tmp_path / "w.sdk"), solutions=True) as out:
+        with pytest.raises(ValueError):
+            out.append(PUZZLES[0][:80])
+        with pytest.raises(ValueError):
+            out.append(PUZZLES[0], "f" * 81)
+        out.append(PUZZLES[0])
+    with Corpus(str(tmp_path / "w.sdk")) as corpus:
+        assert list(corpus.items()) == [(PUZZLES[0], None)]
+
+
+def test_malformed_lines(tmp_path):
+    assert parse_line("x" * 81) is None
+    assert parse_line("٣" * 81) is None
+    bad = []
+    assert from_text(["1" * 81, "12", "٣" * 81], str(tmp_path / "b.sdk"), bad=bad) == 1
+    assert bad == [2, 3]
+    with pytest.raises(ValueError):
+        from_text(["12"], str(tmp_path / "c.sdk"))
+
+
+def test_not_a_corpus(tmp_path):
+    for name, data in (("empty", b""), ("short", b"SDKC"), ("text", PUZZLES[0].encode() * 2)):
+        path = tmp_path / name
+        path.write_bytes(data)
+        with pytest.raises(ValueError):
+            Corpus(str(path))
+
+
+@pytest.mark.parametrize("flags,record_size", [(0, 2 * PACKED), (1, PACKED), (0, 1), (1, 0)])
+def test_record_size_must_match_flags(tmp_path, flags, record_size):
+    path = tmp_path / "r.sdk"
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, flags, record_size, 1) + bytes(2 * PACKED))
+    with pytest.raises(ValueError, match="record size"):
+        Corpus(str(path))
+
+
+def test_rejects_nibbles_above_nine(tmp_path):
+    path = tmp_path / "n.sdk"
+    record = bytearray(pack(PUZZLES[0]))
+    record[3] |= 0xA0
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 0, PACKED, 1) + record)
+    with Corpus(str(path)) as corpus:
+        with pytest.raises(ValueError, match="above 9"):
+            corpus[0]
+        with pytest.raises(ValueError, match="above 9"):
+            list(corpus)
+        pytest.importorskip("numpy")
+        from sudoku import batch
+        view = corpus.view()
+        with pytest.raises(ValueError, match="above 9"):
+            batch.from_records(view, corpus.record_size)
+        view.release()
+
+
+def test_close_with_live_view(tmp_path):
+    path = str(tmp_path / "v.sdk")
+    from_text(PUZZLES[:3], path)
+    corpus = Corpus(path)
+    view = corpus.view(1)
+    corpus.close()
+    assert corpus._file.closed
+    assert unpack(view[:41]) == PUZZLES[1]
+    view.release()
+    corpus.close()
+
+
+def test_batch_reads_records_from_the_mapping(tmp_path):
+    pytest.importorskip("numpy")
+    from sudoku import batch
+    puzzles = PUZZLES[:7] + ["55" + PUZZLES[0][2:]]
+    path = str(tmp_path / "b.sdk")
+    from_text([f"{p} {reference(p) or ''}" for p in puzzles], path, solutions=True)
+    with Corpus(path) as corpus:
+        assert batch.to_strings(batch.from_records(corpus.view(), corpus.record_size)) == puzzles
+        solved = [sol for sol, _ in batch.iter_solve_corpus(corpus, chunksize=3)]
+    assert solved == [reference(p) for p in puzzles]
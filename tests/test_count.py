@@ -0,0 +1,50 @@
+"""Solution counting and uniqueness."""
+import pytest
+
+from conftest import grid
+from sudoku import dlx
+from sudoku.csp import count_solutions, unique
+from sudoku.puzzles import PUZZLES
+
+UNIQUE = PUZZLES[:3]
+# PUZZLES[1] with a wrong digit in a blank cell: no given clashes, no solution
+UNSOLVABLE = "503020600900305001001806400008102900700000008006708200002609500800203009005010300"
+# PUZZLES[1] without its first six givens
+AMBIGUOUS = "000000000000000001001806400008102900700000008006708200002609500800203009005010300"
+
+
+@pytest.mark.parametrize("engine", ["csp", "iterative", "dlx"])
+@pytest.mark.parametrize("flags", [{}, dict(use_mrv=True, use_fc=True), dict(use_mac=False)],
+                         ids=["defaults", "mrv+fc", "no-mac"])
+def test_count_solutions(engine, flags):
+    opts = {} if engine == "dlx" else flags
+    for puzzle in UNIQUE:
+        assert count_solutions(grid(puzzle), engine=engine, **opts) == 1
+    assert count_solutions(grid(UNSOLVABLE), engine=engine, **opts) == 0
+    for limit in (1, 2, 5):
+        expected = dlx.count_solutions(grid(AMBIGUOUS), limit)
+        assert count_solutions(grid(AMBIGUOUS), limit, engine=engine, **opts) == expected
+    assert dlx.count_solutions(grid(AMBIGUOUS), 5) > 1
+    assert count_solutions(grid(AMBIGUOUS), 0, engine=engine, **opts) == 0
+
+
+def test_clashing_givens():
+    assert count_solutions(grid("55" + PUZZLES[0][2:])) == 0
+
+
+def test_count_4x4():
+    # Every 4x4 Sudoku grid: 288 of them
+    empty = [["0"] * 4 for _ in range(4)]
+    assert count_solutions(empty, 1000) == 288
+    assert count_solutions(empty, 1000, use_mac=False, use_hidden_singles=False) == 288
+
+
+def test_unique():
+    assert unique(grid(PUZZLES[0]))
+    assert not unique(grid(AMBIGUOUS))
+    assert not unique(grid(UNSOLVABLE), engine="dlx")
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        count_solutions(grid(PUZZLES[0]), engine="nope")
@@ -0,0 +1,31 @@
+"""Dancing Links engine."""
+from conftest import grid, reference
+from sudoku import dlx
+from sudoku.csp import solve
+from sudoku.puzzles import PUZZLES
+
+CLASH = "55" + PUZZLES[0][2:]
+
+
+def test_solutions_are_valid_and_keep_givens():
+    for puzzle in PUZZLES[:10]:
+        sol = reference(puzzle)
+        assert all(p in ("0", s) for p, s in zip(puzzle, sol))
+        assert dlx.count_solutions(grid(sol)) == 1
+
+
+def test_engine_option():
+    assert solve(grid(PUZZLES[0]), engine="dlx") == dlx.solve(grid(PUZZLES[0]))
+    assert solve(grid(CLASH), engine="dlx") is None
+
+
+def test_clashing_givens():
+    assert dlx.solve(grid(CLASH)) is None
+    assert dlx.count_solutions(grid(CLASH)) == 0
+
+
+def test_count_stops_at_limit():
+    empty = [["0"] * 9 for _ in range(9)]
+    assert dlx.count_solutions(empty, 1) == 1
+    assert dlx.count_solutions(empty, 50) == 50
+    assert dlx.count_solutions(empty, 0) == 0
@@ -0,0 +1,44 @@
+"""Puzzle generation and grading."""
+import pytest
+
+from conftest import grid, reference
+from sudoku import dlx
+from sudoku.generator import GRADES, generate, generate_many, grade
+from sudoku.puzzles import PUZZLES
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_puzzles_are_unique_and_match_their_solution(seed):
+    rec = generate(seed)
+    puzzle = rec["puzzle"]
+    assert dlx.count_solutions(grid(puzzle), 2) == 1
+    assert reference(puzzle) == rec["solution"]
+    assert rec["givens"] == 81 - puzzle.count("0") >= 17
+    assert rec["grade"] in GRADES and rec["seed"] == seed
+
+
+def test_same_seed_same_puzzle():
+    assert generate(7) == generate(7)
+    assert generate(7)["puzzle"] != generate(8)["puzzle"]
+
+
+def test_symmetric_and_min_givens():
+    rec = generate(3, symmetric=True, min_givens=30)
+    puzzle = rec["puzzle"]
+    assert rec["givens"] >= 30
+    assert all((puzzle[i] == "0") == (puzzle[80 - i] == "0") for i in range(81))
+
+
+def test_generate_many_is_independent_of_workers():
+    serial = list(generate_many(6, seed=11, workers=1))
+    parallel = list(generate_many(6, seed=11, workers=2, chunksize=2))
+    assert serial == parallel
+    assert len({rec["seed"] for rec in serial}) == 6
+
+
+def test_grade():
+    report = grade(PUZZLES[1])
+    assert report["grade"] == "easy" and report["techniques"] == ["singles"]
+    assert grade(PUZZLES[6])["grade"] == "medium"
+    hard = grade(PUZZLES[7])
+    assert hard["techniques"] == ["singles", "subsets", "search"] and hard["nodes"] > 0
@@ -0,0 +1,66 @@
+"""Portfolio racing and randomized restarts."""
+import pytest
+
+from conftest import grid, reference
+from sudoku.csp import SearchAborted, SearchBudget
+from sudoku.portfolio import PORTFOLIO, PortfolioSolver, luby, solve_randomized
+from sudoku.puzzles import PUZZLES
+
+HARD = "000000010400000000020000000000050407008000300001090000300400200050100000000806000"
+
+
+def test_luby():
+    assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_solve_randomized(seed):
+    for puzzle in PUZZLES[:8]:
+        sol = solve_randomized(grid(puzzle), seed, use_mrv=True, use_fc=True)
+        assert sol == grid(reference(puzzle))
+    assert solve_randomized(grid("55" + PUZZLES[0][2:]), seed, use_mrv=True, use_fc=True) is None
+    with pytest.raises(SearchAborted):
+        solve_randomized(grid(PUZZLES[7]), seed, budget=SearchBudget(max_nodes=3))
+
+
+def test_default_prefix_mixes_configurations():
+    # Even two workers race different flags, one of them with restarts
+    first = [opts for _, opts in PORTFOLIO[:2]]
+    assert sum("seed" in opts for opts in first) == 1
+    flags = [{k: v for k, v in opts.items() if k != "seed"} for opts in first]
+    assert flags[0] != flags[1]
+
+
+def test_race_returns_first_answer_and_counts_wins():
+    # Plain backtracking needs a second or more on HARD, MRV+FC milliseconds
+    configs = [("slow", dict()), ("fast", dict(use_mrv=True, use_fc=True))]
+    with PortfolioSolver(configs) as racer:
+        for puzzle in PUZZLES[6:9]:
+            sol, name = racer.solve(grid(puzzle))
+            assert sol == grid(reference(puzzle))
+        assert sum(racer.wins.values()) == 3
+        sol, name = racer.solve(grid(HARD))
+        assert name == "fast" and sol == grid(reference(HARD))
+        assert racer.wins["fast"] >= 1
+        results = list(racer.iter_solve(PUZZLES[:3]))
+    assert [sol for sol, _, _ in results] == [reference(p) for p in PUZZLES[:3]]
+
+
+def test_race_budget_and_errors():
+    with PortfolioSolver([("slow", dict())]) as racer:
+        # Plain backtracking needs far more than 0.2 s on this 17-clue puzzle
+        with pytest.raises(SearchAborted):
+            racer.solve(grid(HARD), budget=SearchBudget(max_seconds=0.2))
+        # The worker dropped it and takes the next puzzle at once
+        assert racer.solve(grid(PUZZLES[1])) == (grid(reference(PUZZLES[1])), "slow")
+    with PortfolioSolver([("dlx", dict(engine="dlx"))]) as racer:
+        with pytest.raises(ValueError):
+            racer.solve([["0"] * 16 for _ in range(16)])
+
+
+def test_spawned_workers():
+    # The GUI races from a thread next to Tk, where forking is unsafe
+    configs = [("mrv+fc", dict(use_mrv=True, use_fc=True)), ("dlx", dict(engine="dlx"))]
+    with PortfolioSolver(configs, start_method="spawn") as racer:
+        sol, name = racer.solve(grid(PUZZLES[7]))
+    assert sol == grid(reference(PUZZLES[7])) and name in racer.wins
@@ -0,0 +1,87 @@
+"""Solver engines and flag sets against the Dancing Links reference."""
+import pytest
+
+from conftest import assert_solves, grid
+from sudoku import dlx
+from sudoku.csp import NogoodCache, SearchStats, SudokuCSP, solve
+from sudoku.puzzles import PUZZLES
+
+UNIQUE = PUZZLES[:3]
+# PUZZLES[1] with a wrong digit in a blank cell: no given clashes, no solution
+UNSOLVABLE = "503020600900305001001806400008102900700000008006708200002609500800203009005010300"
+# PUZZLES[1] without its first six givens
+AMBIGUOUS = "000000000000000001001806400008102900700000008006708200002609500800203009005010300"
+
+FLAG_SETS = [
+    {},
+    dict(use_mrv=True),
+    dict(use_lcv=True),
+    dict(use_fc=True),
+    dict(use_mrv=True, use_fc=True),
+    dict(use_mrv=True, use_lcv=True, use_fc=True),
+    dict(use_ac3=True),
+    dict(use_mrv=True, use_ac3=True, use_fc=True),
+    dict(use_mac=True),
+    dict(use_mrv=True, use_mac=True, use_degree=True),
+    dict(use_mrv=True, use_fc=True, use_hidden_singles=True),
+    dict(use_mrv=True, use_fc=True, use_naked_subsets=True, use_box_line=True),
+    dict(use_mrv=True, use_mac=True, use_hidden_singles=True, use_naked_subsets=True,
+         use_box_line=True),
+]
+
+ENGINES = [
+    dict(engine="csp"),
+    dict(engine="iterative"),
+    dict(engine="csp", use_cbj=True),
+]
+
+
+@pytest.mark.parametrize("engine", ENGINES, ids=lambda e: "+".join(f"{k}={v}" for k, v in e.items()))
+@pytest.mark.parametrize("flags", FLAG_SETS, ids=lambda f: "+".join(f) or "plain")
+def test_flags_match_dlx(engine, flags):
+    for puzzle in UNIQUE:
+        assert solve(grid(puzzle), **flags, **engine) == dlx.solve(grid(puzzle))
+    assert dlx.solve(grid(UNSOLVABLE)) is None
+    assert solve(grid(UNSOLVABLE), **flags, **engine) is None
+    sol = solve(grid(AMBIGUOUS), **flags, **engine)
+    assert sol is not None
+    assert_solves(grid(AMBIGUOUS), sol)
+
+
+def test_backjump_keeps_nogoods_per_search():
+    # Nogoods learned on one puzzle must not leak into the next search
+    first = {}
+    for puzzle in (UNIQUE + [UNSOLVABLE, AMBIGUOUS]) * 2:
+        stats = SearchStats()
+        sol = solve(grid(puzzle), use_fc=True, use_cbj=True, stats=stats)
+        if puzzle == AMBIGUOUS:
+            assert_solves(grid(puzzle), sol)
+        else:
+            assert sol == dlx.solve(grid(puzzle))
+        counts = (stats.nodes, stats.backjumps)
+        assert first.setdefault(puzzle, counts) == counts
+    for puzzle in PUZZLES[:30]:
+        csp = SudokuCSP(grid(puzzle))
+        assert csp.backjump(use_fc=True)
+        assert csp.get_solution() == dlx.solve(grid(puzzle))
+
+
+def test_nogood_cache():
+    nogoods = NogoodCache(maxsize=2, max_literals=2)
+    nogoods.add([(0, 1), (1, 2)])
+    nogoods.add([(0, 1), (1, 2), (2, 3)])  # too long
+    assert len(nogoods) == 1
+    values = [0] * 81
+    assert nogoods.violated(0, 1, values) is None
+    values[1] = 2
+    assert nogoods.violated(0, 1, values) == ((0, 1), (1, 2))
+    assert nogoods.hits == 1
+    nogoods.add([(3, 4)])
+    nogoods.add([(5, 6)])
+    assert len(nogoods) == 2 and nogoods.evictions == 1
+    assert nogoods.violated(0, 1, values) is None
+
+
+def test_cbj_needs_csp_engine():
+    with pytest.raises(ValueError):
+        solve(grid(UNIQUE[0]), use_cbj=True, engine="iterative")
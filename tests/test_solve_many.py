@@ -0,0 +1,43 @@
+"""Batch solving over a process pool."""
+import pytest
+
+from conftest import reference
+from sudoku.csp import iter_solve, solve_many
+from sudoku.puzzles import PUZZLES
+
+CLASH = "55" + PUZZLES[0][2:]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_keep_input_order(workers):
+    puzzles = PUZZLES[:12] + [CLASH] + PUZZLES[12:20]
+    expected = [reference(p) for p in puzzles]
+    # chunksize 3 spreads the input over more chunks than workers
+    assert solve_many(puzzles, workers=workers, chunksize=3, use_mrv=True, use_fc=True) == expected
+
+
+def test_iter_solve_is_lazy_and_timed():
+    consumed = []
+
+    def source():
+        for puzzle in PUZZLES[:10]:
+            consumed.append(puzzle)
+            yield puzzle
+
+    results = iter_solve(source(), workers=1, chunksize=2, use_mrv=True, use_fc=True)
+    sol, seconds = next(results)
+    assert sol == reference(PUZZLES[0]) and seconds >= 0
+    assert len(consumed) == 2
+    assert [s for s, _ in results] == [reference(p) for p in PUZZLES[1:10]]
+
+
+def test_empty_input():
+    assert solve_many([], workers=2) == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_errors_reach_the_caller(workers):
+    with pytest.raises(ValueError):
+        solve_many(PUZZLES[:3], workers=workers, engine="nope")
+    with pytest.raises(ValueError):
+        solve_many(PUZZLES[:3] + ["123"], workers=workers)
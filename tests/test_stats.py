@@ -0,0 +1,39 @@
+"""Search instrumentation."""
+import pytest
+
+from conftest import grid, reference
+from sudoku.csp import SearchStats, SudokuCSP, solve, solve_string
+from sudoku.puzzles import PUZZLES
+
+
+@pytest.mark.parametrize("engine", ["csp", "iterative"])
+def test_counters(engine):
+    puzzle = PUZZLES[0]
+    stats = SearchStats()
+    assert solve_string(puzzle, use_fc=True, engine=engine, stats=stats) == reference(puzzle)
+    blanks = puzzle.count("0")
+    # One node per assignment on the solution path, plus the final check
+    assert stats.nodes >= blanks + 1
+    assert stats.max_depth == blanks
+    assert stats.depth == blanks
+    assert stats.pruned_fc > 0 and stats.pruned_ac3 == 0
+    assert stats.phase_time["forward_check"] > 0
+    assert set(stats.phase_time) == set(SearchStats.PHASES)
+    summary = stats.summary()
+    assert summary.startswith(f"{stats.nodes} nodes, {stats.backtracks} backtracks")
+    assert "backjumped" not in summary
+
+
+def test_counters_add_up_over_solves():
+    stats = SearchStats()
+    solve(grid(PUZZLES[1]), use_mrv=True, use_ac3=True, stats=stats)
+    first = stats.nodes
+    solve(grid(PUZZLES[2]), use_mrv=True, use_ac3=True, stats=stats)
+    assert stats.nodes > first and stats.pruned_ac3 > 0
+
+
+def test_uninstrumented_solver_is_untouched():
+    csp = SudokuCSP(grid(PUZZLES[0]))
+    assert "select_unassigned_variable" not in vars(csp)
+    csp.attach_stats(SearchStats())
+    assert "select_unassigned_variable" in vars(csp)